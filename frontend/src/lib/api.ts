@@ -101,7 +101,7 @@ export const chat = {
 export const evals = {
   list: (page = 1, pageSize = 50) =>
     apiFetch<EvalRunListResponse>(
-      `/api/evals?page=${page}&page_size=${pageSize}`
+      `/api/evals?page=${page}&page_size=${pageSize}&with_total=true`
     ),
 
   datasets: () => apiFetch<EvalDatasetInfo[]>("/api/evals/datasets"),
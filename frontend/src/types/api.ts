@@ -22,6 +22,7 @@ export interface ChatRequest {
   session_id?: string | null;
   include_sources?: boolean;
   max_sources?: number;
+  skeleton_of_thought?: boolean;
 }
 
 export interface ChatResponse {
@@ -33,10 +34,11 @@ export interface ChatResponse {
 }
 
 export interface StreamChunk {
-  type: "content" | "citation" | "done" | "error";
+  type: "status" | "content" | "citation" | "meta" | "done" | "error";
   content?: string | null;
   citation?: Citation | null;
   error?: string | null;
+  confidence?: "high" | "medium" | "low" | null;
   run_id?: string | null;
   session_id?: string | null;
 }
@@ -56,9 +58,10 @@ export interface DocumentResponse {
 
 export interface DocumentListResponse {
   documents: DocumentResponse[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface DocumentChunkResponse {
@@ -120,9 +123,10 @@ export interface EvalRunDetailResponse extends EvalRunResponse {
 
 export interface EvalRunListResponse {
   eval_runs: EvalRunResponse[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface EvalDatasetInfo {
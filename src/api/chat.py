@@ -1,41 +1,78 @@
 """Chat API endpoints."""
 
-import json
 import logging
 import time
-import uuid
 from typing import AsyncGenerator
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.dependencies import get_agent
 from src.database import get_db
 from src.schemas.chat import ChatRequest, ChatResponse, ChatMessage, StreamChunk
 from src.services.agent import RAGAgent
-from src.services.tracing import TracingService
+from src.services.tracing import TracingService, generate_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Keep nginx from re-buffering the stream
+}
+
+# Streamed content is flushed once this many bytes are buffered or this much
+# time has passed since the last write, whichever comes first
+STREAM_FLUSH_BYTES = 8192
+STREAM_FLUSH_INTERVAL_S = 0.05
+
+# Messages fetched per round trip when loading chat history
+HISTORY_BATCH_SIZE = 200
+
+_stream_chunk_adapter = TypeAdapter(StreamChunk)
+
+# Content chunks always have the same shape, so only the text needs encoding
+_CONTENT_FRAME_PREFIX = b'data: {"type":"content","content":'
+_CONTENT_FRAME_SUFFIX = b"}\n\n"
+
+
+def encode_content_frame(content: str) -> bytes:
+    """Encode a content chunk as an SSE frame without going through the model."""
+    return _CONTENT_FRAME_PREFIX + to_json(content) + _CONTENT_FRAME_SUFFIX
+
+
+def _sse_frame(chunk: StreamChunk) -> bytes:
+    """Encode a stream chunk as a server-sent event frame.
+
+    Serializes straight to bytes and omits null fields, which keeps the
+    per-token frames small. Token chunks take the pre-built template path.
+    """
+    if chunk.type == "content" and chunk.content is not None:
+        return encode_content_frame(chunk.content)
+    return b"data: " + _stream_chunk_adapter.dump_json(chunk, exclude_none=True) + b"\n\n"
+
 
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     db: AsyncSession = Depends(get_db),
+    agent: RAGAgent = Depends(get_agent),
 ) -> ChatResponse:
     """Send a chat message and get a response with citations."""
     start_time = time.time()
-    run_id = str(uuid.uuid4())
-    session_id = request.session_id or str(uuid.uuid4())
+    run_id = generate_id()
+    session_id = request.session_id or generate_id()
 
-    # Initialize services
-    agent = RAGAgent()
     tracer = TracingService(run_id=run_id, session_id=session_id)
 
     try:
         # Get response from agent
-        response = await agent.chat(
+        answer = agent.chat_sot if request.skeleton_of_thought else agent.chat
+        response = await answer(
             message=request.message,
             session_id=session_id,
             max_sources=request.max_sources,
@@ -79,15 +116,21 @@ async def chat(
 async def chat_stream(
     request: ChatRequest,
     db: AsyncSession = Depends(get_db),
+    agent: RAGAgent = Depends(get_agent),
 ) -> StreamingResponse:
     """Stream a chat response with citations."""
-    run_id = str(uuid.uuid4())
-    session_id = request.session_id or str(uuid.uuid4())
+    run_id = generate_id()
+    session_id = request.session_id or generate_id()
 
-    async def generate() -> AsyncGenerator[str, None]:
-        agent = RAGAgent()
+    async def generate() -> AsyncGenerator[bytes, None]:
         tracer = TracingService(run_id=run_id, session_id=session_id)
 
+        # Coalesce token frames into larger writes. Citations and the first
+        # content chunk are flushed immediately to keep time-to-first-token low.
+        buffer = bytearray()
+        last_flush = time.monotonic()
+        sent_content = False
+
         try:
             async for chunk in agent.chat_stream(
                 message=request.message,
@@ -95,15 +138,28 @@ async def chat_stream(
                 max_sources=request.max_sources,
                 tracer=tracer,
             ):
-                yield f"data: {chunk.model_dump_json()}\n\n"
-
-            # Send done chunk
+                buffer += _sse_frame(chunk)
+                is_first_content = chunk.type == "content" and not sent_content
+                if (
+                    chunk.type != "content"
+                    or is_first_content
+                    or len(buffer) >= STREAM_FLUSH_BYTES
+                    or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL_S
+                ):
+                    sent_content = sent_content or chunk.type == "content"
+                    yield bytes(buffer)
+                    buffer.clear()
+                    last_flush = time.monotonic()
+
+            # Send remaining content together with the done chunk
             done_chunk = StreamChunk(
                 type="done",
                 run_id=run_id,
                 session_id=session_id,
             )
-            yield f"data: {done_chunk.model_dump_json()}\n\n"
+            buffer += _sse_frame(done_chunk)
+            yield bytes(buffer)
+            buffer.clear()
 
             # Save trace events
             await tracer.flush(db)
@@ -111,18 +167,15 @@ async def chat_stream(
         except Exception as e:
             logger.error(f"Stream error: {e}")
             error_chunk = StreamChunk(type="error", error=str(e))
-            yield f"data: {error_chunk.model_dump_json()}\n\n"
+            buffer += _sse_frame(error_chunk)
+            yield bytes(buffer)
             await tracer.log_error(str(e))
             await tracer.flush(db)
 
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=SSE_HEADERS,
     )
 
 
@@ -136,31 +189,30 @@ async def get_chat_history(
     from sqlalchemy import select
     from src.models.run import Run, Message
 
-    # Get runs for this session
-    result = await db.execute(
-        select(Run)
+    # Limit to the most recent runs, then fetch their messages in one round trip
+    recent_runs = (
+        select(Run.id, Run.created_at)
         .where(Run.session_id == session_id)
         .order_by(Run.created_at.desc())
         .limit(limit)
+        .subquery()
     )
-    runs = result.scalars().all()
-
-    history = []
-    for run in runs:
-        messages_result = await db.execute(
-            select(Message)
-            .where(Message.run_id == run.id)
-            .order_by(Message.created_at)
-        )
-        messages = messages_result.scalars().all()
-
-        for msg in messages:
-            history.append({
-                "role": msg.role,
-                "content": msg.content,
-                "citations": json.loads(msg.citations) if msg.citations else None,
-                "is_refusal": msg.is_refusal,
-                "timestamp": msg.created_at.isoformat(),
-            })
+    messages = await db.stream_scalars(
+        select(Message)
+        .join(recent_runs, Message.run_id == recent_runs.c.id)
+        .order_by(recent_runs.c.created_at.desc(), Message.created_at)
+        .execution_options(yield_per=HISTORY_BATCH_SIZE)
+    )
+
+    history = [
+        {
+            "role": msg.role,
+            "content": msg.content,
+            "citations": msg.citations,
+            "is_refusal": msg.is_refusal,
+            "timestamp": msg.created_at.isoformat(),
+        }
+        async for msg in messages
+    ]
 
     return {"session_id": session_id, "messages": history}
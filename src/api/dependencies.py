@@ -0,0 +1,22 @@
+"""FastAPI dependencies for the shared service instances created at startup."""
+
+from fastapi import Request
+
+from src.services.agent import RAGAgent
+from src.services.evaluation import EvaluationService
+from src.services.ingestion import IngestionService
+
+
+def get_agent(request: Request) -> RAGAgent:
+    """Dependency to get the shared RAG agent."""
+    return request.app.state.agent
+
+
+def get_ingestion_service(request: Request) -> IngestionService:
+    """Dependency to get the shared ingestion service."""
+    return request.app.state.ingestion
+
+
+def get_evaluation_service(request: Request) -> EvaluationService:
+    """Dependency to get the shared evaluation service."""
+    return request.app.state.evaluation
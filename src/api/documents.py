@@ -1,16 +1,22 @@
 """Document management API endpoints."""
 
+import asyncio
 import logging
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Response, UploadFile, status
+from pydantic import TypeAdapter
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload, undefer
 
+from src.api.dependencies import get_ingestion_service
+from src.api.pagination import count_total_in_new_session, fetch_keyset_page
+from src.cache import TTLCache, clear_on_write
 from src.config import get_settings
 from src.database import get_db
+from src.middleware import HTTP_413_CONTENT_TOO_LARGE
 from src.models.document import Document, DocumentChunk
 from src.schemas.document import (
     DocumentDetailResponse,
@@ -23,69 +29,130 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 settings = get_settings()
 
+ALLOWED_CONTENT_TYPES = frozenset({"application/pdf", "text/plain", "text/markdown"})
+
+# Columns needed to build a DocumentResponse (excludes raw text and file bytes)
+DOCUMENT_RESPONSE_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.original_filename,
+    Document.content_type,
+    Document.file_size,
+    Document.status,
+    Document.error_message,
+    Document.chunk_count,
+    Document.created_at,
+    Document.updated_at,
+)
+
+_document_list_adapter = TypeAdapter(list[DocumentResponse])
+
+# Serialized list pages keyed by query parameters; cleared on document writes
+LIST_CACHE_SIZE = 256
+LIST_CACHE_TTL_S = 30
+_list_cache = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL_S)
+clear_on_write(_list_cache, Document)
+
+# Read uploads in 1 MiB pieces so oversized files are rejected early
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 @router.get("", response_model=DocumentListResponse)
 async def list_documents(
     page: int = 1,
     page_size: int = 20,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
     db: AsyncSession = Depends(get_db),
-) -> DocumentListResponse:
-    """List all documents with pagination."""
-    offset = (page - 1) * page_size
-
-    query = select(Document).order_by(Document.created_at.desc())
+) -> Response:
+    """List all documents with pagination.
+
+    Pass the returned next_cursor as cursor to page by keyset instead of offset.
+    The total is only computed when with_total is set.
+    """
+    cache_key = (page, page_size, status_filter, cursor, with_total)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    query = select(Document).order_by(Document.created_at.desc(), Document.id.desc())
     if status_filter:
         query = query.where(Document.status == status_filter)
 
-    # Get total count
-    count_query = select(func.count(Document.id))
-    if status_filter:
-        count_query = count_query.where(Document.status == status_filter)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Get paginated results
-    query = query.offset(offset).limit(page_size)
-    result = await db.execute(query)
-    documents = result.scalars().all()
+    # Get the page, and the total count (opt-in) concurrently on its own session
+    fetch_page = fetch_keyset_page(db, query, Document, page, page_size, cursor)
+    if with_total:
+        count_query = select(func.count(Document.id))
+        if status_filter:
+            count_query = count_query.where(Document.status == status_filter)
+        (documents, next_cursor), total = await asyncio.gather(
+            fetch_page,
+            count_total_in_new_session(
+                count_query, table_name=None if status_filter else "documents"
+            ),
+        )
+    else:
+        documents, next_cursor = await fetch_page
+        total = None
 
-    return DocumentListResponse(
-        documents=[DocumentResponse.model_validate(doc) for doc in documents],
+    response = DocumentListResponse(
+        # One validator pass for the whole page instead of one call per row
+        documents=_document_list_adapter.validate_python(documents, from_attributes=True),
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+    )
+    content = response.model_dump_json().encode()
+    _list_cache.set(cache_key, content)
+    return Response(content=content, media_type="application/json")
+
+
+def _file_too_large() -> HTTPException:
+    """Error for uploads over the configured size limit."""
+    return HTTPException(
+        status_code=HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File too large. Maximum size: {settings.max_file_size_mb}MB",
     )
 
 
-@router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
+    ingestion_service: IngestionService = Depends(get_ingestion_service),
 ) -> DocumentResponse:
-    """Upload and process a new document."""
+    """Upload a new document and queue it for processing.
+
+    Returns immediately with status "pending"; poll GET /{document_id} for progress.
+    """
     # Validate file type
-    allowed_types = ["application/pdf", "text/plain", "text/markdown"]
     content_type = file.content_type or "application/octet-stream"
 
-    if content_type not in allowed_types:
+    if content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type: {content_type}. Allowed: {allowed_types}",
+            detail=(
+                f"Unsupported file type: {content_type}. "
+                f"Allowed: {sorted(ALLOWED_CONTENT_TYPES)}"
+            ),
         )
 
-    # Read file bytes
-    file_bytes = await file.read()
+    # Check the parsed size before copying anything into memory
+    if file.size is not None and file.size > settings.max_file_size_bytes:
+        raise _file_too_large()
+
+    # Read file bytes in chunks, aborting as soon as the size limit is exceeded
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > settings.max_file_size_bytes:
+            raise _file_too_large()
+    file_bytes = bytes(buffer)
     file_size = len(file_bytes)
 
-    # Check file size
-    if file_size > settings.max_file_size_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.max_file_size_mb}MB",
-        )
-
     # Generate unique filename
     unique_filename = f"{uuid.uuid4()}"
 
@@ -103,7 +170,6 @@ async def upload_document(
     await db.refresh(document)
 
     # Process document in background
-    ingestion_service = IngestionService()
     background_tasks.add_task(
         ingestion_service.process_document_from_bytes,
         document.id,
@@ -124,6 +190,8 @@ async def get_document(
     query = select(Document).where(Document.id == document_id)
     if include_chunks:
         query = query.options(selectinload(Document.chunks))
+    else:
+        query = query.options(noload(Document.chunks))
 
     result = await db.execute(query)
     document = result.scalar_one_or_none()
@@ -143,56 +211,68 @@ async def delete_document(
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Delete a document and its chunks."""
+    # Bulk deletes: avoids loading every chunk (and its embedding) to cascade
+    await db.execute(
+        delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
+    )
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
+        delete(Document).where(Document.id == document_id).returning(Document.id)
     )
-    document = result.scalar_one_or_none()
 
-    if not document:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Document {document_id} not found",
         )
 
-    # Delete from database (cascades to chunks)
-    await db.delete(document)
     await db.commit()
 
 
-@router.post("/{document_id}/reprocess", response_model=DocumentResponse)
+@router.post(
+    "/{document_id}/reprocess",
+    response_model=DocumentResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def reprocess_document(
     document_id: int,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
+    ingestion_service: IngestionService = Depends(get_ingestion_service),
 ) -> DocumentResponse:
     """Reprocess a document (re-chunk and re-embed)."""
+    # Reset status in one statement, only if there is content to reprocess
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
-    )
-    document = result.scalar_one_or_none()
-
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Document {document_id} not found",
+        update(Document)
+        .where(Document.id == document_id)
+        .where(
+            or_(
+                and_(Document.raw_text.is_not(None), Document.raw_text != ""),
+                Document.file_bytes.is_not(None),
+            )
         )
-
-    if not document.raw_text and not document.file_bytes:
+        .values(status="pending", error_message=None)
+        .returning(*DOCUMENT_RESPONSE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    document = result.one_or_none()
+
+    if document is None:
+        exists = await db.execute(select(Document.id).where(Document.id == document_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Document {document_id} not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No stored content available for reprocessing",
         )
 
-    # Reset status
-    document.status = "pending"
-    document.error_message = None
     await db.commit()
 
-    # Process document in background
-    ingestion_service = IngestionService()
-    background_tasks.add_task(ingestion_service.reprocess_document, document.id)
+    # Process document in background (status was already reset above)
+    background_tasks.add_task(ingestion_service.process_document, document.id)
 
-    await db.refresh(document)
     return DocumentResponse.model_validate(document)
 
 
@@ -203,7 +283,9 @@ async def get_document_raw_text(
 ) -> dict:
     """Get the raw extracted text of a document."""
     result = await db.execute(
-        select(Document).where(Document.id == document_id)
+        select(Document)
+        .where(Document.id == document_id)
+        .options(undefer(Document.raw_text), noload(Document.chunks))
     )
     document = result.scalar_one_or_none()
 
@@ -217,5 +299,5 @@ async def get_document_raw_text(
         "document_id": document.id,
         "filename": document.original_filename,
         "raw_text": document.raw_text,
-        "has_file_bytes": document.file_bytes is not None,
+        "has_file_bytes": document.has_file_bytes,
     }
@@ -1,20 +1,22 @@
 """Evaluation API endpoints."""
 
-import json
+import asyncio
 import logging
-from pathlib import Path
-from typing import Optional
+from typing import AsyncGenerator, Literal, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.api.dependencies import get_evaluation_service
+from src.api.pagination import count_total_in_new_session, fetch_keyset_page
+from src.cache import TTLCache, clear_on_write
 from src.config import get_settings
-from src.database import get_db
+from src.database import get_db, get_db_context
 from src.models.eval_run import EvalResult, EvalRun
 from src.schemas.eval import (
-    EvalDataset,
     EvalMetrics,
     EvalRunDetailResponse,
     EvalRunListResponse,
@@ -22,12 +24,23 @@ from src.schemas.eval import (
     EvalRunResponse,
     EvalResultResponse,
 )
-from src.services.evaluation import EvaluationService
+from src.services.evaluation import EvaluationService, list_dataset_infos, load_dataset
+from src.services.tracing import generate_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 settings = get_settings()
 
+# Result streaming: rows fetched per database round trip / bytes per JSON write
+RESULTS_STREAM_BATCH_SIZE = 500
+RESULTS_STREAM_FLUSH_BYTES = 64 * 1024
+
+# Serialized list pages keyed by query parameters; cleared on eval run writes
+LIST_CACHE_SIZE = 256
+LIST_CACHE_TTL_S = 30
+_list_cache = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL_S)
+clear_on_write(_list_cache, EvalRun)
+
 
 def _build_metrics(eval_run: EvalRun) -> Optional[EvalMetrics]:
     """Build metrics object from eval run."""
@@ -60,61 +73,79 @@ def _eval_run_to_response(eval_run: EvalRun) -> EvalRunResponse:
     )
 
 
+def _eval_result_to_response(eval_result: EvalResult) -> EvalResultResponse:
+    """Convert EvalResult model to response schema."""
+    return EvalResultResponse(
+        case_id=eval_result.case_id,
+        question=eval_result.question,
+        expected_answer=eval_result.expected_answer,
+        actual_answer=eval_result.actual_answer,
+        citations=eval_result.citations,
+        groundedness_score=eval_result.groundedness_score,
+        hallucination_detected=eval_result.hallucination_detected,
+        schema_compliant=eval_result.schema_compliant,
+        tool_calls_correct=eval_result.tool_calls_correct,
+        latency_ms=eval_result.latency_ms,
+        status=eval_result.status,
+        error_message=eval_result.error_message,
+    )
+
+
 @router.get("", response_model=EvalRunListResponse)
 async def list_eval_runs(
     page: int = 1,
     page_size: int = 20,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
     db: AsyncSession = Depends(get_db),
-) -> EvalRunListResponse:
-    """List all evaluation runs with pagination."""
-    offset = (page - 1) * page_size
-
-    query = select(EvalRun).order_by(EvalRun.created_at.desc())
+) -> Response:
+    """List all evaluation runs with pagination.
+
+    Pass the returned next_cursor as cursor to page by keyset instead of offset.
+    The total is only computed when with_total is set.
+    """
+    cache_key = (page, page_size, status_filter, cursor, with_total)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    query = select(EvalRun).order_by(EvalRun.created_at.desc(), EvalRun.id.desc())
     if status_filter:
         query = query.where(EvalRun.status == status_filter)
 
-    # Get total count
-    count_query = select(func.count(EvalRun.id))
-    if status_filter:
-        count_query = count_query.where(EvalRun.status == status_filter)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Get paginated results
-    query = query.offset(offset).limit(page_size)
-    result = await db.execute(query)
-    eval_runs = result.scalars().all()
+    # Get the page, and the total count (opt-in) concurrently on its own session
+    fetch_page = fetch_keyset_page(db, query, EvalRun, page, page_size, cursor)
+    if with_total:
+        count_query = select(func.count(EvalRun.id))
+        if status_filter:
+            count_query = count_query.where(EvalRun.status == status_filter)
+        (eval_runs, next_cursor), total = await asyncio.gather(
+            fetch_page,
+            count_total_in_new_session(
+                count_query, table_name=None if status_filter else "eval_runs"
+            ),
+        )
+    else:
+        eval_runs, next_cursor = await fetch_page
+        total = None
 
-    return EvalRunListResponse(
+    response = EvalRunListResponse(
         eval_runs=[_eval_run_to_response(run) for run in eval_runs],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
+    content = response.model_dump_json().encode()
+    _list_cache.set(cache_key, content)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/datasets")
 async def list_datasets() -> list[dict]:
     """List available evaluation datasets."""
-    datasets_dir = Path("eval_datasets")
-    datasets = []
-
-    if datasets_dir.exists():
-        for file_path in datasets_dir.glob("*.json"):
-            try:
-                with open(file_path) as f:
-                    data = json.load(f)
-                datasets.append({
-                    "name": file_path.stem,
-                    "filename": file_path.name,
-                    "description": data.get("description", ""),
-                    "case_count": len(data.get("cases", [])),
-                })
-            except Exception as e:
-                logger.warning(f"Failed to read dataset {file_path}: {e}")
-
-    return datasets
+    return await asyncio.to_thread(list_dataset_infos)
 
 
 @router.post("", response_model=EvalRunResponse, status_code=status.HTTP_201_CREATED)
@@ -122,20 +153,18 @@ async def create_eval_run(
     request: EvalRunRequest,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
+    eval_service: EvaluationService = Depends(get_evaluation_service),
 ) -> EvalRunResponse:
     """Create and start a new evaluation run."""
     # Load dataset
-    dataset_path = Path("eval_datasets") / f"{request.dataset_name}.json"
-    if not dataset_path.exists():
+    try:
+        # File reads and JSON parsing on a cache miss stay off the event loop
+        dataset = await asyncio.to_thread(load_dataset, request.dataset_name)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Dataset '{request.dataset_name}' not found",
         )
-
-    try:
-        with open(dataset_path) as f:
-            dataset_data = json.load(f)
-        dataset = EvalDataset(**dataset_data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -143,9 +172,8 @@ async def create_eval_run(
         )
 
     # Create eval run record
-    import uuid
     eval_run = EvalRun(
-        eval_id=str(uuid.uuid4()),
+        eval_id=generate_id(),
         name=request.name,
         description=request.description,
         dataset_name=request.dataset_name,
@@ -157,7 +185,6 @@ async def create_eval_run(
     await db.refresh(eval_run)
 
     # Start evaluation in background
-    eval_service = EvaluationService()
     background_tasks.add_task(eval_service.run_evaluation, eval_run.id)
 
     return _eval_run_to_response(eval_run)
@@ -192,47 +219,95 @@ async def get_eval_run(
         status=eval_run.status,
         error_message=eval_run.error_message,
         metrics=_build_metrics(eval_run),
-        results=[
-            EvalResultResponse(
-                case_id=r.case_id,
-                question=r.question,
-                expected_answer=r.expected_answer,
-                actual_answer=r.actual_answer,
-                citations=json.loads(r.citations) if r.citations else None,
-                groundedness_score=r.groundedness_score,
-                hallucination_detected=r.hallucination_detected,
-                schema_compliant=r.schema_compliant,
-                tool_calls_correct=r.tool_calls_correct,
-                latency_ms=r.latency_ms,
-                status=r.status,
-                error_message=r.error_message,
-            )
-            for r in eval_run.results
-        ],
+        results=[_eval_result_to_response(r) for r in eval_run.results],
         started_at=eval_run.started_at,
         completed_at=eval_run.completed_at,
         created_at=eval_run.created_at,
     )
 
 
+@router.get("/{eval_id}/results")
+async def stream_eval_results(
+    eval_id: str,
+    format: Literal["ndjson", "json"] = "ndjson",
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Stream the results of an evaluation run as NDJSON or a JSON array.
+
+    Rows are fetched from the database in batches so large runs are never
+    materialized in memory at once.
+    """
+    result = await db.execute(select(EvalRun.id).where(EvalRun.eval_id == eval_id))
+    eval_run_id = result.scalar_one_or_none()
+
+    if eval_run_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Evaluation run '{eval_id}' not found",
+        )
+
+    async def generate_rows() -> AsyncGenerator[str, None]:
+        # Own session: the request-scoped one may be closed while streaming
+        async with get_db_context() as stream_db:
+            rows = await stream_db.stream_scalars(
+                select(EvalResult)
+                .where(EvalResult.eval_run_id == eval_run_id)
+                .order_by(EvalResult.id)
+                .execution_options(yield_per=RESULTS_STREAM_BATCH_SIZE)
+            )
+            async for eval_result in rows:
+                yield _eval_result_to_response(eval_result).model_dump_json()
+
+    async def generate_ndjson() -> AsyncGenerator[str, None]:
+        async for row in generate_rows():
+            yield row + "\n"
+
+    async def generate_json_array() -> AsyncGenerator[str, None]:
+        # Group rows into ~64 KiB writes instead of one send per row
+        buffer = ["["]
+        buffered = 1
+        separator = ""
+        async for row in generate_rows():
+            buffer.append(separator)
+            buffer.append(row)
+            buffered += len(row) + 1
+            separator = ","
+            if buffered >= RESULTS_STREAM_FLUSH_BYTES:
+                yield "".join(buffer)
+                buffer.clear()
+                buffered = 0
+        buffer.append("]")
+        yield "".join(buffer)
+
+    if format == "ndjson":
+        return StreamingResponse(generate_ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(generate_json_array(), media_type="application/json")
+
+
 @router.delete("/{eval_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_eval_run(
     eval_id: str,
     db: AsyncSession = Depends(get_db),
 ) -> None:
-    """Delete an evaluation run."""
+    """Delete an evaluation run and its results."""
+    # Bulk deletes: avoids loading every result row to cascade
+    await db.execute(
+        delete(EvalResult).where(
+            EvalResult.eval_run_id.in_(
+                select(EvalRun.id).where(EvalRun.eval_id == eval_id).scalar_subquery()
+            )
+        )
+    )
     result = await db.execute(
-        select(EvalRun).where(EvalRun.eval_id == eval_id)
+        delete(EvalRun).where(EvalRun.eval_id == eval_id).returning(EvalRun.id)
     )
-    eval_run = result.scalar_one_or_none()
 
-    if not eval_run:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Evaluation run '{eval_id}' not found",
         )
 
-    await db.delete(eval_run)
     await db.commit()
 
 
@@ -240,27 +315,37 @@ async def delete_eval_run(
 async def cancel_eval_run(
     eval_id: str,
     db: AsyncSession = Depends(get_db),
+    eval_service: EvaluationService = Depends(get_evaluation_service),
 ) -> EvalRunResponse:
     """Cancel a running evaluation."""
     result = await db.execute(
-        select(EvalRun).where(EvalRun.eval_id == eval_id)
+        update(EvalRun)
+        .where(EvalRun.eval_id == eval_id)
+        .where(EvalRun.status.in_(["pending", "running"]))
+        .values(status="cancelled")
+        .returning(EvalRun)
+        .execution_options(synchronize_session=False)
     )
     eval_run = result.scalar_one_or_none()
 
-    if not eval_run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Evaluation run '{eval_id}' not found",
+    if eval_run is None:
+        # Nothing updated: distinguish a missing run from a finished one
+        status_result = await db.execute(
+            select(EvalRun.status).where(EvalRun.eval_id == eval_id)
         )
-
-    if eval_run.status not in ["pending", "running"]:
+        current_status = status_result.scalar_one_or_none()
+        if current_status is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Evaluation run '{eval_id}' not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot cancel evaluation in status '{eval_run.status}'",
+            detail=f"Cannot cancel evaluation in status '{current_status}'",
         )
 
-    eval_run.status = "cancelled"
     await db.commit()
-    await db.refresh(eval_run)
+    # Stop the run now if this worker executes it; others see the status
+    eval_service.cancel(eval_run.id)
 
     return _eval_run_to_response(eval_run)
@@ -0,0 +1,103 @@
+"""Keyset (cursor) pagination helpers shared by list endpoints."""
+
+import base64
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import async_session_maker
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor string."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor into (created_at, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    query: Select,
+    model,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+) -> tuple[list, Optional[str]]:
+    """Fetch one page of a query ordered by (created_at, id) descending.
+
+    Pages by cursor when one is given, otherwise by offset. Returns the rows
+    and the cursor for the next page (None on the last page).
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(model.created_at, model.id) < (cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    # Fetch one extra row to detect whether there is a next page
+    query = query.limit(page_size + 1).execution_options(yield_per=page_size + 1)
+
+    items = []
+    next_cursor = None
+    rows = await db.stream_scalars(query)
+    async for row in rows:
+        if len(items) == page_size:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+            break
+        items.append(row)
+    await rows.close()
+
+    return items, next_cursor
+
+
+# Below this many rows an exact count(*) is cheap enough to keep
+ESTIMATE_MIN_ROWS = 10_000
+
+
+async def count_total(
+    db: AsyncSession,
+    count_query: Select,
+    table_name: Optional[str] = None,
+) -> int:
+    """Count rows for a list endpoint.
+
+    When table_name is given (i.e. no filters apply) on Postgres, the planner's
+    reltuples estimate is used for large tables instead of a sequential count(*).
+    """
+    if table_name and db.bind.dialect.name == "postgresql":
+        result = await db.execute(
+            text("SELECT reltuples::BIGINT FROM pg_class WHERE relname = :name"),
+            {"name": table_name},
+        )
+        estimate = result.scalar()
+        if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+            return estimate
+
+    result = await db.execute(count_query)
+    return result.scalar() or 0
+
+
+async def count_total_in_new_session(
+    count_query: Select,
+    table_name: Optional[str] = None,
+) -> int:
+    """Run count_total on its own session so it can overlap with the page query."""
+    async with async_session_maker() as count_db:
+        return await count_total(count_db, count_query, table_name=table_name)
@@ -1,24 +1,162 @@
 """Trace API endpoints."""
 
-import json
+import asyncio
 import logging
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, bindparam, case, delete, func, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
-from src.models.trace import TraceEvent
+from src.cache import TTLCache
+from src.database import async_session_maker, get_db, get_db_context
+from src.models.trace import TraceEvent, TraceEventHourly
 from src.schemas.trace import (
     TraceDetailResponse,
     TraceEventResponse,
     TraceListResponse,
 )
+from src.services.trace_rollup import get_rollup_watermark
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Events fetched per database round trip when streaming NDJSON
+EVENTS_STREAM_BATCH_SIZE = 500
+
+# Trace details are cached once a run has stopped receiving events. The TTL
+# bounds staleness across worker processes, which do not share the cache.
+TRACE_CACHE_SIZE = 1024
+TRACE_CACHE_TTL_S = 60
+TRACE_SETTLED_AFTER = timedelta(seconds=5)
+
+_trace_cache = TTLCache(maxsize=TRACE_CACHE_SIZE, ttl=TRACE_CACHE_TTL_S)
+
+# Statements for the per-run endpoints, built once; run_id is bound per call
+_EVENTS_BY_RUN = (
+    select(TraceEvent)
+    .where(TraceEvent.run_id == bindparam("run_id"))
+    .order_by(TraceEvent.timestamp)
+)
+_SUMMARY_BY_RUN = (
+    select(
+        TraceEvent.event_type,
+        func.count(TraceEvent.id).label("event_count"),
+        func.sum(TraceEvent.duration_ms).label("duration_ms"),
+        func.sum(
+            func.coalesce(TraceEvent.tokens_in, 0)
+            + func.coalesce(TraceEvent.tokens_out, 0)
+        ).label("tokens"),
+        func.sum(TraceEvent.cost_usd).label("cost_usd"),
+        func.max(case((TraceEvent.status == "error", 1), else_=0)).label("has_error"),
+    )
+    .where(TraceEvent.run_id == bindparam("run_id"))
+    .group_by(TraceEvent.event_type)
+)
+_DELETE_BY_RUN = delete(TraceEvent).where(TraceEvent.run_id == bindparam("run_id"))
+_DELETE_ROLLUPS_BY_RUN = delete(TraceEventHourly).where(
+    TraceEventHourly.run_id == bindparam("run_id")
+)
+
+
+def _event_to_response(event: TraceEvent) -> TraceEventResponse:
+    """Convert TraceEvent model to response schema.
+
+    Rows come from our own table with known types, so validation is skipped.
+    """
+    return TraceEventResponse.model_construct(
+        id=event.id,
+        trace_id=event.trace_id,
+        run_id=event.run_id,
+        session_id=event.session_id,
+        event_type=event.event_type,
+        event_name=event.event_name,
+        event_data=event.event_data or {},
+        duration_ms=event.duration_ms,
+        tokens_in=event.tokens_in,
+        tokens_out=event.tokens_out,
+        cost_usd=event.cost_usd,
+        status=event.status,
+        error_message=event.error_message,
+        timestamp=event.timestamp,
+    )
+
+
+def _event_aggregates() -> list:
+    """Per-run aggregate columns over trace_events for the trace listing."""
+    return [
+        func.count(TraceEvent.id).label("event_count"),
+        func.coalesce(func.sum(TraceEvent.duration_ms), 0).label("total_duration_ms"),
+        func.coalesce(
+            func.sum(
+                func.coalesce(TraceEvent.tokens_in, 0)
+                + func.coalesce(TraceEvent.tokens_out, 0)
+            ),
+            0,
+        ).label("total_tokens"),
+        func.coalesce(func.sum(TraceEvent.cost_usd), 0.0).label("total_cost_usd"),
+        func.min(TraceEvent.timestamp).label("first_event_at"),
+        func.max(TraceEvent.timestamp).label("last_event_at"),
+        # Error flag computed in the same pass (portable form of bool_or)
+        func.max(case((TraceEvent.status == "error", 1), else_=0)).label("has_error"),
+    ]
+
+
+def _trace_list_query(session_id: Optional[str], event_type: Optional[str]) -> Select:
+    """Build the one-row-per-run aggregate query behind list_traces.
+
+    Closed hours are read from the hourly rollups and only events after the
+    rollup watermark are aggregated from trace_events. Filtering by event type
+    needs the raw events, so it always scans trace_events.
+    """
+    watermark = get_rollup_watermark()
+
+    if watermark is None or event_type:
+        query = select(
+            TraceEvent.run_id, TraceEvent.session_id, *_event_aggregates()
+        ).group_by(TraceEvent.run_id, TraceEvent.session_id)
+        if session_id:
+            query = query.where(TraceEvent.session_id == session_id)
+        if event_type:
+            query = query.where(TraceEvent.event_type == event_type)
+        return query
+
+    rolled_up = select(
+        TraceEventHourly.run_id,
+        TraceEventHourly.session_id,
+        TraceEventHourly.event_count,
+        TraceEventHourly.duration_sum_ms.label("total_duration_ms"),
+        TraceEventHourly.tokens_sum.label("total_tokens"),
+        TraceEventHourly.cost_sum_usd.label("total_cost_usd"),
+        TraceEventHourly.first_event_at,
+        TraceEventHourly.last_event_at,
+        TraceEventHourly.error_count.label("has_error"),
+    ).where(TraceEventHourly.bucket_hour < watermark)
+    recent = (
+        select(TraceEvent.run_id, TraceEvent.session_id, *_event_aggregates())
+        .where(TraceEvent.timestamp >= watermark)
+        .group_by(TraceEvent.run_id, TraceEvent.session_id)
+    )
+    if session_id:
+        rolled_up = rolled_up.where(TraceEventHourly.session_id == session_id)
+        recent = recent.where(TraceEvent.session_id == session_id)
+
+    # A run spanning the watermark (or several hours) has several parts
+    parts = union_all(rolled_up, recent).subquery()
+    return select(
+        parts.c.run_id,
+        parts.c.session_id,
+        func.sum(parts.c.event_count).label("event_count"),
+        func.sum(parts.c.total_duration_ms).label("total_duration_ms"),
+        func.sum(parts.c.total_tokens).label("total_tokens"),
+        func.sum(parts.c.total_cost_usd).label("total_cost_usd"),
+        func.min(parts.c.first_event_at).label("first_event_at"),
+        func.max(parts.c.last_event_at).label("last_event_at"),
+        func.max(parts.c.has_error).label("has_error"),
+    ).group_by(parts.c.run_id, parts.c.session_id)
+
 
 @router.get("", response_model=TraceListResponse)
 async def list_traces(
@@ -31,55 +169,40 @@ async def list_traces(
     """List traces grouped by run_id with pagination."""
     offset = (page - 1) * page_size
 
-    # Subquery to get unique run_ids with aggregated stats
-    base_query = select(
-        TraceEvent.run_id,
-        TraceEvent.session_id,
-        func.count(TraceEvent.id).label("event_count"),
-        func.sum(TraceEvent.duration_ms).label("total_duration_ms"),
-        func.sum(TraceEvent.tokens_in + TraceEvent.tokens_out).label("total_tokens"),
-        func.sum(TraceEvent.cost_usd).label("total_cost_usd"),
-        func.min(TraceEvent.timestamp).label("first_event_at"),
-        func.max(TraceEvent.timestamp).label("last_event_at"),
-    ).group_by(TraceEvent.run_id, TraceEvent.session_id)
-
-    if session_id:
-        base_query = base_query.where(TraceEvent.session_id == session_id)
-    if event_type:
-        base_query = base_query.where(TraceEvent.event_type == event_type)
-
-    # Get total count of unique runs
-    count_subquery = base_query.subquery()
-    count_result = await db.execute(select(func.count()).select_from(count_subquery))
-    total = count_result.scalar() or 0
+    # One row per run with aggregated stats
+    base_query = _trace_list_query(session_id, event_type)
 
-    # Get paginated results
-    query = base_query.order_by(func.max(TraceEvent.timestamp).desc())
+    # Get paginated results; the window count returns the number of runs
+    # alongside each row, so no separate count query is needed
+    query = base_query.add_columns(func.count().over().label("full_count"))
+    query = query.order_by(base_query.selected_columns.last_event_at.desc())
     query = query.offset(offset).limit(page_size)
     result = await db.execute(query)
     rows = result.all()
 
-    traces = []
-    for row in rows:
-        # Check if any event has error status
-        error_check = await db.execute(
-            select(TraceEvent.status)
-            .where(TraceEvent.run_id == row.run_id)
-            .where(TraceEvent.status == "error")
-            .limit(1)
+    if rows:
+        total = rows[0].full_count
+    elif offset:
+        # Past the last page: no rows carry the count, so fall back to counting
+        count_result = await db.execute(
+            select(func.count()).select_from(base_query.subquery())
         )
-        has_error = error_check.scalar_one_or_none() is not None
+        total = count_result.scalar() or 0
+    else:
+        total = 0
 
+    traces = []
+    for row in rows:
         traces.append({
             "run_id": row.run_id,
             "session_id": row.session_id,
             "event_count": row.event_count,
-            "total_duration_ms": row.total_duration_ms or 0,
-            "total_tokens": row.total_tokens or 0,
-            "total_cost_usd": float(row.total_cost_usd or 0),
-            "status": "error" if has_error else "success",
-            "first_event_at": row.first_event_at.isoformat() if row.first_event_at else None,
-            "last_event_at": row.last_event_at.isoformat() if row.last_event_at else None,
+            "total_duration_ms": row.total_duration_ms,
+            "total_tokens": row.total_tokens,
+            "total_cost_usd": row.total_cost_usd,
+            "status": "error" if row.has_error else "success",
+            "first_event_at": row.first_event_at,
+            "last_event_at": row.last_event_at,
         })
 
     return TraceListResponse(
@@ -90,16 +213,39 @@ async def list_traces(
     )
 
 
+async def _trace_summary(run_id: str) -> dict:
+    """Aggregate summary statistics for a run in the database.
+
+    Groups by event type so the per-type counts come back in the same query;
+    runs on its own session so it can overlap with the events fetch.
+    """
+    async with async_session_maker() as summary_db:
+        rows = (await summary_db.execute(_SUMMARY_BY_RUN, {"run_id": run_id})).all()
+
+    return {
+        "total_events": sum(row.event_count for row in rows),
+        "total_duration_ms": sum(row.duration_ms or 0 for row in rows),
+        "total_tokens": sum(row.tokens or 0 for row in rows),
+        "total_cost_usd": sum(row.cost_usd or 0.0 for row in rows),
+        "event_type_counts": {row.event_type: row.event_count for row in rows},
+        "has_errors": any(row.has_error for row in rows),
+    }
+
+
 @router.get("/{run_id}", response_model=TraceDetailResponse)
 async def get_trace(
     run_id: str,
     db: AsyncSession = Depends(get_db),
 ) -> TraceDetailResponse:
     """Get detailed trace for a run."""
-    result = await db.execute(
-        select(TraceEvent)
-        .where(TraceEvent.run_id == run_id)
-        .order_by(TraceEvent.timestamp)
+    cached = _trace_cache.get(run_id)
+    if cached is not None:
+        return cached
+
+    # Fetch the events and aggregate the summary concurrently (separate sessions)
+    result, summary = await asyncio.gather(
+        db.execute(_EVENTS_BY_RUN, {"run_id": run_id}),
+        _trace_summary(run_id),
     )
     events = result.scalars().all()
 
@@ -110,96 +256,58 @@ async def get_trace(
         )
 
     # Build response
-    event_responses = []
-    total_duration = 0
-    total_tokens = 0
-    total_cost = 0.0
-    event_type_counts = {}
-
-    for event in events:
-        event_data = json.loads(event.event_data) if event.event_data else {}
-        event_responses.append(
-            TraceEventResponse(
-                id=event.id,
-                trace_id=event.trace_id,
-                run_id=event.run_id,
-                session_id=event.session_id,
-                event_type=event.event_type,
-                event_name=event.event_name,
-                event_data=event_data,
-                duration_ms=event.duration_ms,
-                tokens_in=event.tokens_in,
-                tokens_out=event.tokens_out,
-                cost_usd=event.cost_usd,
-                status=event.status,
-                error_message=event.error_message,
-                timestamp=event.timestamp,
-            )
-        )
-
-        if event.duration_ms:
-            total_duration += event.duration_ms
-        if event.tokens_in:
-            total_tokens += event.tokens_in
-        if event.tokens_out:
-            total_tokens += event.tokens_out
-        if event.cost_usd:
-            total_cost += event.cost_usd
-
-        event_type_counts[event.event_type] = event_type_counts.get(event.event_type, 0) + 1
-
-    summary = {
-        "total_events": len(events),
-        "total_duration_ms": total_duration,
-        "total_tokens": total_tokens,
-        "total_cost_usd": total_cost,
-        "event_type_counts": event_type_counts,
-        "has_errors": any(e.status == "error" for e in events),
-    }
+    event_responses = [_event_to_response(event) for event in events]
 
-    return TraceDetailResponse(
+    response = TraceDetailResponse(
         run_id=run_id,
         session_id=events[0].session_id if events else "",
         events=event_responses,
         summary=summary,
     )
 
+    # Timestamps are written with utcnow() by the tracer
+    if datetime.utcnow() - events[-1].timestamp >= TRACE_SETTLED_AFTER:
+        _trace_cache.set(run_id, response)
+
+    return response
 
-@router.get("/{run_id}/events")
+
+@router.get("/{run_id}/events", response_model=list[TraceEventResponse])
 async def get_trace_events(
     run_id: str,
     event_type: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
     db: AsyncSession = Depends(get_db),
 ) -> list[TraceEventResponse]:
-    """Get all events for a trace, optionally filtered by type."""
-    query = select(TraceEvent).where(TraceEvent.run_id == run_id)
+    """Get all events for a trace, optionally filtered by type.
+
+    With format=ndjson the events are streamed one per line, fetched from the
+    database in batches, for runs too large to build in memory.
+    """
+    query = _EVENTS_BY_RUN
+    params = {"run_id": run_id}
 
     if event_type:
-        query = query.where(TraceEvent.event_type == event_type)
+        query = query.where(TraceEvent.event_type == bindparam("event_type"))
+        params["event_type"] = event_type
 
-    query = query.order_by(TraceEvent.timestamp)
-    result = await db.execute(query)
+    if format == "ndjson":
+        async def generate_ndjson() -> AsyncGenerator[str, None]:
+            # Own session: the request-scoped one may be closed while streaming
+            async with get_db_context() as stream_db:
+                events = await stream_db.stream_scalars(
+                    query.execution_options(yield_per=EVENTS_STREAM_BATCH_SIZE),
+                    params,
+                )
+                async for event in events:
+                    yield _event_to_response(event).model_dump_json() + "\n"
+
+        return StreamingResponse(generate_ndjson(), media_type="application/x-ndjson")
+
+    result = await db.execute(query, params)
     events = result.scalars().all()
 
-    return [
-        TraceEventResponse(
-            id=event.id,
-            trace_id=event.trace_id,
-            run_id=event.run_id,
-            session_id=event.session_id,
-            event_type=event.event_type,
-            event_name=event.event_name,
-            event_data=json.loads(event.event_data) if event.event_data else {},
-            duration_ms=event.duration_ms,
-            tokens_in=event.tokens_in,
-            tokens_out=event.tokens_out,
-            cost_usd=event.cost_usd,
-            status=event.status,
-            error_message=event.error_message,
-            timestamp=event.timestamp,
-        )
-        for event in events
-    ]
+    return [_event_to_response(event) for event in events]
 
 
 @router.delete("/{run_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -208,16 +316,15 @@ async def delete_trace(
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Delete all trace events for a run."""
-    result = await db.execute(
-        select(TraceEvent).where(TraceEvent.run_id == run_id).limit(1)
-    )
-    if not result.scalar_one_or_none():
+    # Single statement: the affected row count doubles as the existence check
+    _trace_cache.pop(run_id)
+    result = await db.execute(_DELETE_BY_RUN, {"run_id": run_id})
+    await db.execute(_DELETE_ROLLUPS_BY_RUN, {"run_id": run_id})
+
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Trace for run '{run_id}' not found",
         )
 
-    await db.execute(
-        TraceEvent.__table__.delete().where(TraceEvent.run_id == run_id)
-    )
     await db.commit()
@@ -0,0 +1,81 @@
+"""In-process caching helpers."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after ttl seconds.
+
+    Not shared between worker processes. Methods never await, so it is safe to
+    use from coroutines on a single event loop without a lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+
+def clear_on_write(cache, *models: type) -> None:
+    """Clear cache (anything with a clear() method) after any commit that
+    wrote rows of the given models.
+
+    Covers unit-of-work flushes as well as ORM-enabled bulk insert, update
+    and delete statements. Only sessions in this process are seen, so other
+    workers keep serving their entries until the TTL expires.
+    """
+    flag = f"clear_cache_{id(cache)}"
+
+    def _mark(session: Session) -> None:
+        session.info[flag] = True
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session: Session, flush_context) -> None:
+        changed = session.new | session.dirty | session.deleted
+        if any(isinstance(obj, models) for obj in changed):
+            _mark(session)
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _do_orm_execute(orm_execute_state) -> None:
+        if orm_execute_state.is_select:
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, models):
+            _mark(orm_execute_state.session)
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session: Session) -> None:
+        if session.info.pop(flag, False):
+            cache.clear()
@@ -20,32 +20,55 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o"
     embedding_model: str = "text-embedding-3-small"
     embedding_dimensions: int = 1536
+    embedding_half_precision: bool = True  # Store embeddings as halfvec (pgvector 0.7+)
 
     # Database - Postgres
     database_url: str = "postgresql+asyncpg://localhost/ragops"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800  # Seconds; stays under typical idle timeouts
+    db_null_pool: bool = False  # Set when PgBouncer (transaction mode) owns pooling
+    db_pool_pre_ping: bool = True  # Drops connections left dead by DB restarts or failovers
+    db_statement_cache_size: int = 1024  # asyncpg prepared statements per connection
 
     # File Storage
     max_file_size_mb: int = 10
     store_raw_files: bool = True
 
+    # Ingestion
+    parse_workers: int = 2  # Processes for CPU-bound PDF parsing
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"  # Empty disables the on-disk cache
+
     # RAG Settings
     chunk_size: int = 512
     chunk_overlap: int = 50
     top_k_retrieval: int = 10
     rerank_top_k: int = 5
     min_relevance_score: float = 0.3
+    hnsw_ef_search: int = 40  # HNSW candidate list size; higher = better recall, slower
+
+    # Semantic response cache (answers reused for near-identical questions)
+    semantic_cache_size: int = 1024  # 0 disables
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for a hit
+    # Document changes only clear the cache in the worker that wrote them; other
+    # workers can serve stale answers for up to this long
+    semantic_cache_ttl_seconds: int = 60
 
     # Reranking
     enable_reranking: bool = True  # Set to False for low-memory environments
     rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
     # Evaluation Settings
-    eval_batch_size: int = 10
+    eval_batch_size: int = 10  # Concurrent cases; latencies are measured under this load
     eval_timeout_seconds: int = 30
 
     # Observability
     enable_telemetry: bool = True
     otel_service_name: str = "ragops-lab"
+    trace_rollup_interval_seconds: int = 300  # 0 disables hourly trace rollups
+    trace_batch_size: int = 1000  # Trace events per batched INSERT
+    trace_flush_interval_ms: int = 50  # 0 writes each request's events directly
 
     # Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
@@ -53,6 +76,7 @@ class Settings(BaseSettings):
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = 1  # Each worker has its own DB pool and parse processes
 
     @property
     def max_file_size_bytes(self) -> int:
@@ -5,9 +5,12 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import text
+from pydantic_core import from_json, to_json
+from sqlalchemy import JSON, event, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 from src.config import get_settings
 
@@ -23,8 +26,27 @@ class Base(DeclarativeBase):
 # Make Vector type available for models
 VectorType = Vector
 
+# JSON columns: native JSONB on Postgres, JSON-encoded TEXT elsewhere (e.g. SQLite)
+JSONType = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+# Columns created as TEXT by earlier versions that are now JSONB on Postgres
+JSONB_COLUMN_UPGRADES = [
+    ("messages", "citations"),
+    ("eval_results", "citations"),
+    ("trace_events", "event_data"),
+]
+
+# High-fanout tables whose id sequences hand each session a block of values,
+# so concurrent inserters do not contend on nextval() for every row
+SEQUENCE_CACHE_TABLES = ("trace_events", "document_chunks", "eval_results")
+SEQUENCE_CACHE_SIZE = 100
+
 settings = get_settings()
 
+# pgvector type for stored embeddings. halfvec keeps 16-bit floats, halving
+# heap and HNSW index size; queries are cast to the same type.
+EMBEDDING_COLUMN_TYPE = "halfvec" if settings.embedding_half_precision else "vector"
+
 # Parse database URL and handle SSL for asyncpg
 database_url = settings.database_url
 
@@ -36,16 +58,61 @@ if "sslmode=require" in database_url or "sslmode=prefer" in database_url:
     database_url = database_url.replace("?sslmode=prefer", "").replace("&sslmode=prefer", "")
     connect_args["ssl"] = "require"
 
+# asyncpg prepares and caches statements per connection. PgBouncer in
+# transaction mode hands each transaction a different server connection, so
+# the cache is disabled there.
+if "asyncpg" in database_url:
+    connect_args["statement_cache_size"] = (
+        0 if settings.db_null_pool else settings.db_statement_cache_size
+    )
+
+# Let an external pooler (e.g. PgBouncer) own connections when configured
+if settings.db_null_pool:
+    pool_args = {"poolclass": NullPool}
+else:
+    pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+def _json_serializer(value) -> str:
+    """Encode JSON/JSONB column values with pydantic-core's Rust encoder."""
+    return to_json(value).decode()
+
+
 engine = create_async_engine(
     database_url,
     echo=settings.log_level == "DEBUG",
     future=True,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    pool_pre_ping=settings.db_pool_pre_ping,
     connect_args=connect_args,
+    json_serializer=_json_serializer,
+    json_deserializer=from_json,
+    **pool_args,
 )
 
+# SQLite (local dev / CI): WAL lets readers run alongside the writer, and
+# memory-mapped I/O serves hot pages without read() calls
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+if "sqlite" in settings.database_url:
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """Apply performance PRAGMAs to each new SQLite connection."""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -65,13 +132,55 @@ async def init_db() -> None:
         await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created")
 
+        if "sqlite" not in settings.database_url:
+            await _upgrade_jsonb_columns(conn)
+            await _drop_ivfflat_embedding_index(conn)
+            await _convert_embedding_column(conn)
+            await _cache_id_sequences(conn)
+
+        # create_all skips existing tables, so add indexes introduced since
+        await conn.run_sync(_create_missing_indexes)
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    """Create model indexes that do not exist yet on already-created tables."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def _upgrade_jsonb_columns(conn) -> None:
+    """Convert legacy TEXT JSON columns to JSONB in place."""
+    for table, column in JSONB_COLUMN_UPGRADES:
+        result = await conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ),
+            {"table": table, "column": column},
+        )
+        if result.scalar() == "text":
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} "
+                    f"TYPE jsonb USING {column}::jsonb"
+                )
+            )
+            logger.info(f"Converted {table}.{column} to jsonb")
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency to get database session."""
+    """Dependency to get database session.
+
+    Only pending ORM changes are committed on exit; endpoints that run Core
+    INSERT/UPDATE/DELETE statements commit explicitly. Read-only requests skip
+    the COMMIT round trip.
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            if session.new or session.dirty or session.deleted:
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -91,3 +200,57 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def _drop_ivfflat_embedding_index(conn) -> None:
+    """Drop the legacy ivfflat embedding index so it is rebuilt as HNSW."""
+    result = await conn.execute(
+        text(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE indexname = 'ix_document_chunks_embedding'"
+        )
+    )
+    indexdef = result.scalar()
+    if indexdef and "ivfflat" in indexdef:
+        await conn.execute(text("DROP INDEX ix_document_chunks_embedding"))
+        logger.info("Dropped ivfflat embedding index; recreating as hnsw")
+
+
+async def _cache_id_sequences(conn) -> None:
+    """Let sessions preallocate ids for high-fanout tables (ids may have gaps)."""
+    for table in SEQUENCE_CACHE_TABLES:
+        result = await conn.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}
+        )
+        sequence = result.scalar()
+        if sequence:
+            await conn.execute(
+                text(f"ALTER SEQUENCE {sequence} CACHE {SEQUENCE_CACHE_SIZE}")
+            )
+
+
+async def _convert_embedding_column(conn) -> None:
+    """Convert stored embeddings to EMBEDDING_COLUMN_TYPE in place.
+
+    The HNSW index is tied to the old type's operator class, so it is dropped
+    here and recreated with the model's indexes.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT udt_name FROM information_schema.columns "
+            "WHERE table_name = 'document_chunks' AND column_name = 'embedding'"
+        )
+    )
+    current_type = result.scalar()
+    if current_type is None or current_type == EMBEDDING_COLUMN_TYPE:
+        return
+
+    column_type = f"{EMBEDDING_COLUMN_TYPE}({int(settings.embedding_dimensions)})"
+    await conn.execute(text("DROP INDEX IF EXISTS ix_document_chunks_embedding"))
+    await conn.execute(
+        text(
+            f"ALTER TABLE document_chunks ALTER COLUMN embedding "
+            f"TYPE {column_type} USING embedding::{column_type}"
+        )
+    )
+    logger.info(f"Converted document_chunks.embedding from {current_type} to {column_type}")
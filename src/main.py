@@ -1,10 +1,11 @@
 """Main FastAPI application with React SPA frontend."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +13,14 @@ from fastapi.staticfiles import StaticFiles
 from src.api import api_router
 from src.config import get_settings
 from src.database import init_db
+from src.middleware import MaxBodySizeMiddleware
+from src.services.agent import RAGAgent
+from src.services.embedding_cache import embedding_cache
+from src.services.evaluation import EvaluationService
+from src.services.ingestion import IngestionService, shutdown_parse_pool
+from src.services.openai_client import close_openai_client
+from src.services.trace_rollup import run_trace_rollups
+from src.services.tracing_buffer import trace_buffer
 
 # Configure logging
 settings = get_settings()
@@ -34,10 +43,33 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized with pgvector extension")
 
+    # Shared service instances (OpenAI clients, reranker) reused across requests
+    app.state.agent = RAGAgent()
+    app.state.ingestion = IngestionService()
+    app.state.evaluation = EvaluationService(agent=app.state.agent)
+
+    # Periodically pre-aggregate closed hours of trace events for listings
+    rollup_task = None
+    if settings.trace_rollup_interval_seconds > 0:
+        rollup_task = asyncio.create_task(
+            run_trace_rollups(settings.trace_rollup_interval_seconds)
+        )
+
+    # Batch trace event inserts across requests
+    if settings.trace_flush_interval_ms > 0:
+        trace_buffer.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down RAGOps Lab...")
+    if rollup_task is not None:
+        rollup_task.cancel()
+    await trace_buffer.stop()  # Write events still queued
+    shutdown_parse_pool()
+    await close_openai_client()
+    if embedding_cache is not None:
+        embedding_cache.close()
 
 
 # Create FastAPI app
@@ -48,6 +80,15 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Reject oversized request bodies before they are parsed (file limit plus
+# allowance for multipart boundaries and form headers). Added before CORS so
+# CORSMiddleware wraps it and early 413 responses still carry CORS headers.
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_body_size=settings.max_file_size_bytes + 64 * 1024,
+    max_file_size_mb=settings.max_file_size_mb,
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -62,13 +103,10 @@ app.include_router(api_router, prefix="/api")
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    from src.services.retrieval import RetrievalService
-
     try:
-        retrieval = RetrievalService()
-        stats = await retrieval.get_stats()
+        stats = await request.app.state.agent.retrieval_service.get_stats()
 
         return JSONResponse(
             content={
@@ -78,6 +116,7 @@ async def health_check():
                 "total_documents": stats["total_documents"],
                 "total_chunks": stats["total_chunks"],
                 "reranking_enabled": stats["reranking_enabled"],
+                "trace_queue_depth": trace_buffer.depth,
             }
         )
     except Exception as e:
@@ -91,13 +130,31 @@ async def health_check():
         )
 
 
+# Vite emits content-hashed bundle names, so assets never change in place
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# index.html and other unhashed files must be revalidated to pick up new builds
+SPA_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+
+
+class HashedAssetFiles(StaticFiles):
+    """StaticFiles that marks responses as immutable for long-term caching.
+
+    ETag/Last-Modified validators and 304 handling come from StaticFiles.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = ASSET_CACHE_CONTROL
+        return response
+
+
 # Serve static frontend files
 static_dir = Path(__file__).parent.parent / "static"
 if static_dir.exists() and (static_dir / "index.html").exists():
     # Mount assets directory for JS/CSS bundles
     assets_dir = static_dir / "assets"
     if assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="assets")
+        app.mount("/assets", HashedAssetFiles(directory=str(assets_dir)), name="assets")
 
     @app.get("/{path:path}")
     async def serve_spa(path: str):
@@ -105,9 +162,9 @@ if static_dir.exists() and (static_dir / "index.html").exists():
         # Try to serve the exact file first
         file_path = static_dir / path
         if file_path.exists() and file_path.is_file():
-            return FileResponse(str(file_path))
+            return FileResponse(str(file_path), headers=SPA_CACHE_HEADERS)
         # Fall back to index.html for client-side routing
-        return FileResponse(str(static_dir / "index.html"))
+        return FileResponse(str(static_dir / "index.html"), headers=SPA_CACHE_HEADERS)
 else:
     @app.get("/")
     async def root():
@@ -125,9 +182,12 @@ else:
 if __name__ == "__main__":
     import uvicorn
 
+    # uvicorn[standard] picks uvloop and httptools automatically when available
+    reload = settings.log_level == "DEBUG"
     uvicorn.run(
         "src.main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        reload=reload,
+        workers=None if reload else settings.workers,
     )
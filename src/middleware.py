@@ -0,0 +1,62 @@
+"""ASGI middleware for RAGOps Lab."""
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Starlette renamed this status constant between versions; use the number
+HTTP_413_CONTENT_TOO_LARGE = 413
+
+
+class MaxBodySizeMiddleware:
+    """Reject request bodies over a size limit before routes parse them.
+
+    Requests declaring a too-large Content-Length are answered with 413 without
+    reading the body; bodies without one (chunked) are counted as they arrive.
+    max_body_size allows for multipart overhead; the error message reports the
+    file size limit (in MB) users actually configure.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, max_file_size_mb: int):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.max_file_size_mb = max_file_size_mb
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if (
+            content_length
+            and content_length.isdigit()
+            and int(content_length) > self.max_body_size
+        ):
+            response = JSONResponse(
+                status_code=HTTP_413_CONTENT_TOO_LARGE,
+                content={"detail": self._detail()},
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(
+                        status_code=HTTP_413_CONTENT_TOO_LARGE,
+                        detail=self._detail(),
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        """Error message for rejected requests."""
+        return f"File too large. Maximum size: {self.max_file_size_mb}MB"
@@ -3,7 +3,7 @@
 from src.models.document import Document, DocumentChunk
 from src.models.eval_run import EvalResult, EvalRun
 from src.models.run import Message, Run
-from src.models.trace import TraceEvent
+from src.models.trace import TraceEvent, TraceEventHourly
 
 __all__ = [
     "Document",
@@ -13,4 +13,5 @@ __all__ = [
     "EvalRun",
     "EvalResult",
     "TraceEvent",
+    "TraceEventHourly",
 ]
@@ -3,12 +3,12 @@
 from datetime import datetime
 from typing import Optional
 
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from sqlalchemy import DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 
 from src.config import get_settings
-from src.database import Base
+from src.database import EMBEDDING_COLUMN_TYPE, Base
 
 settings = get_settings()
 
@@ -24,9 +24,14 @@ class Document(Base):
     content_type: Mapped[str] = mapped_column(String(100), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
 
-    # Raw content storage (stateless architecture)
-    raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    file_bytes: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    # Raw content storage (stateless architecture). Deferred so listings and
+    # detail views do not pull the blobs; undefer() where the content is used.
+    raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
+    file_bytes: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True
+    )
+    has_raw_text: Mapped[bool] = column_property(raw_text.is_not(None))
+    has_file_bytes: Mapped[bool] = column_property(file_bytes.is_not(None))
 
     # Processing status
     status: Mapped[str] = mapped_column(
@@ -45,7 +50,16 @@ class Document(Base):
 
     # Relationships
     chunks: Mapped[list["DocumentChunk"]] = relationship(
-        "DocumentChunk", back_populates="document", cascade="all, delete-orphan"
+        "DocumentChunk",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        lazy="raise",  # Load explicitly (selectinload); lazy IO fails on async sessions
+    )
+
+    # Indexes
+    __table_args__ = (
+        # Keyset pagination on (created_at, id)
+        Index("ix_documents_created_at_id", "created_at", "id"),
     )
 
 
@@ -64,9 +78,12 @@ class DocumentChunk(Base):
     end_char: Mapped[int] = mapped_column(Integer, nullable=False)
     page_number: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
-    # pgvector embedding
+    # pgvector embedding (half precision unless disabled in settings)
     embedding: Mapped[Optional[list]] = mapped_column(
-        Vector(settings.embedding_dimensions), nullable=True
+        (HALFVEC if EMBEDDING_COLUMN_TYPE == "halfvec" else Vector)(
+            settings.embedding_dimensions
+        ),
+        nullable=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -74,16 +91,24 @@ class DocumentChunk(Base):
     )
 
     # Relationships
-    document: Mapped["Document"] = relationship("Document", back_populates="chunks")
+    document: Mapped["Document"] = relationship(
+        "Document", back_populates="chunks", lazy="raise"
+    )
 
     # Indexes
     __table_args__ = (
-        Index("ix_document_chunks_document_id", "document_id"),
+        # Chunks of a document in order; also enforces one chunk per position
+        Index(
+            "ix_document_chunks_document_chunk",
+            "document_id",
+            "chunk_index",
+            unique=True,
+        ),
         Index(
             "ix_document_chunks_embedding",
             "embedding",
-            postgresql_using="ivfflat",
-            postgresql_with={"lists": 100},
-            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": f"{EMBEDDING_COLUMN_TYPE}_cosine_ops"},
         ),
     )
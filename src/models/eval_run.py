@@ -3,10 +3,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.database import Base
+from src.database import Base, JSONType
 
 
 class EvalRun(Base):
@@ -46,7 +46,16 @@ class EvalRun(Base):
 
     # Relationships
     results: Mapped[list["EvalResult"]] = relationship(
-        "EvalResult", back_populates="eval_run", cascade="all, delete-orphan"
+        "EvalResult",
+        back_populates="eval_run",
+        cascade="all, delete-orphan",
+        lazy="raise",  # get_eval_run loads these with selectinload
+    )
+
+    # Indexes
+    __table_args__ = (
+        # Keyset pagination on (created_at, id)
+        Index("ix_eval_runs_created_at_id", "created_at", "id"),
     )
 
 
@@ -65,7 +74,7 @@ class EvalResult(Base):
     question: Mapped[str] = mapped_column(Text, nullable=False)
     expected_answer: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     actual_answer: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    citations: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON
+    citations: Mapped[Optional[list]] = mapped_column(JSONType, nullable=True)
 
     # Per-case metrics
     groundedness_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -85,4 +94,6 @@ class EvalResult(Base):
     )
 
     # Relationships
-    eval_run: Mapped["EvalRun"] = relationship("EvalRun", back_populates="results")
+    eval_run: Mapped["EvalRun"] = relationship(
+        "EvalRun", back_populates="results", lazy="raise"
+    )
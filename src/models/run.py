@@ -3,10 +3,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.database import Base
+from src.database import Base, JSONType
 
 
 class Run(Base):
@@ -16,7 +16,7 @@ class Run(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     run_id: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
-    session_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(String(100), nullable=False)
 
     # Status
     status: Mapped[str] = mapped_column(
@@ -33,7 +33,16 @@ class Run(Base):
 
     # Relationships
     messages: Mapped[list["Message"]] = relationship(
-        "Message", back_populates="run", cascade="all, delete-orphan"
+        "Message",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        lazy="raise",  # Chat history selects Message rows directly
+    )
+
+    # Indexes
+    __table_args__ = (
+        # Chat history: most recent runs of a session
+        Index("ix_runs_session_created", "session_id", "created_at"),
     )
 
 
@@ -54,8 +63,8 @@ class Message(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
     # For assistant messages
-    citations: Mapped[Optional[str]] = mapped_column(
-        Text, nullable=True
+    citations: Mapped[Optional[list]] = mapped_column(
+        JSONType, nullable=True
     )  # JSON array of citations
     is_refusal: Mapped[bool] = mapped_column(default=False)
     refusal_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -70,4 +79,10 @@ class Message(Base):
     )
 
     # Relationships
-    run: Mapped["Run"] = relationship("Run", back_populates="messages")
+    run: Mapped["Run"] = relationship("Run", back_populates="messages", lazy="raise")
+
+    # Indexes
+    __table_args__ = (
+        # Chat history: messages of a run in order
+        Index("ix_messages_run_created", "run_id", "created_at"),
+    )
@@ -3,10 +3,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.database import Base
+from src.database import Base, JSONType
 
 
 class TraceEvent(Base):
@@ -16,8 +16,9 @@ class TraceEvent(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     trace_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    run_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    session_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    # Lookups by run_id / session_id use the composite indexes below
+    run_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    session_id: Mapped[str] = mapped_column(String(100), nullable=False)
 
     # Event type
     event_type: Mapped[str] = mapped_column(
@@ -26,7 +27,7 @@ class TraceEvent(Base):
 
     # Event details (JSON)
     event_name: Mapped[str] = mapped_column(String(255), nullable=False)
-    event_data: Mapped[str] = mapped_column(Text, nullable=False)  # JSON
+    event_data: Mapped[dict] = mapped_column(JSONType, nullable=False)
 
     # Metrics
     duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -47,3 +48,46 @@ class TraceEvent(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
+
+    # Indexes
+    __table_args__ = (
+        # Live listing and rollup scans: events in a time range
+        Index("ix_trace_events_timestamp", "timestamp"),
+        # Trace detail: events for a run ordered by time
+        Index("ix_trace_events_run_ts", "run_id", "timestamp"),
+        # Trace listing: filter by session, group by run
+        Index("ix_trace_events_session_run", "session_id", "run_id"),
+        # JSONB containment (event_data @> ...) lookups; Postgres only
+        Index(
+            "ix_trace_events_event_data_gin",
+            "event_data",
+            postgresql_using="gin",
+            postgresql_ops={"event_data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class TraceEventHourly(Base):
+    """Per-run, per-hour rollup of trace events, used by the trace listing."""
+
+    __tablename__ = "trace_events_hourly"
+
+    run_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    bucket_hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    session_id: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Aggregates over the run's events in this hour
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    duration_sum_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    tokens_sum: Mapped[int] = mapped_column(Integer, nullable=False)
+    cost_sum_usd: Mapped[float] = mapped_column(Float, nullable=False)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_event_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_event_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        # Watermark lookup and bucket range filters
+        Index("ix_trace_events_hourly_bucket", "bucket_hour"),
+        Index("ix_trace_events_hourly_session_run", "session_id", "run_id"),
+    )
@@ -49,6 +49,9 @@ class ChatRequest(BaseModel):
         True, description="Whether to include source citations"
     )
     max_sources: int = Field(5, description="Maximum number of sources to retrieve")
+    skeleton_of_thought: bool = Field(
+        False, description="Outline the answer, then write its points in parallel"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -64,12 +67,17 @@ class ChatResponse(BaseModel):
 class StreamChunk(BaseModel):
     """Schema for streaming response chunk."""
 
-    type: Literal["content", "citation", "done", "error"] = Field(
+    type: Literal["status", "content", "citation", "meta", "done", "error"] = Field(
         ..., description="Type of chunk"
     )
-    content: Optional[str] = Field(None, description="Content for content chunks")
+    content: Optional[str] = Field(
+        None, description="Content for content chunks, or progress text for status chunks"
+    )
     citation: Optional[Citation] = Field(None, description="Citation for citation chunks")
     error: Optional[str] = Field(None, description="Error message for error chunks")
+    confidence: Optional[Literal["high", "medium", "low"]] = Field(
+        None, description="Model confidence (sent with meta chunk)"
+    )
     run_id: Optional[str] = Field(None, description="Run ID (sent with done chunk)")
     session_id: Optional[str] = Field(
         None, description="Session ID (sent with done chunk)"
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DocumentCreate(BaseModel):
@@ -23,8 +23,19 @@ class DocumentChunkResponse(BaseModel):
     end_char: int
     page_number: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+def _chunk_to_response(chunk) -> DocumentChunkResponse:
+    """Build a chunk response from a loaded DocumentChunk without validation."""
+    return DocumentChunkResponse.model_construct(
+        id=chunk.id,
+        chunk_index=chunk.chunk_index,
+        content=chunk.content,
+        start_char=chunk.start_char,
+        end_char=chunk.end_char,
+        page_number=chunk.page_number,
+    )
 
 
 class DocumentResponse(BaseModel):
@@ -41,17 +52,17 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class DocumentListResponse(BaseModel):
     """Schema for document list response."""
 
     documents: list[DocumentResponse]
-    total: int
+    total: Optional[int] = None
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = None
 
 
 class DocumentDetailResponse(BaseModel):
@@ -71,14 +82,11 @@ class DocumentDetailResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     @classmethod
     def model_validate(cls, obj, **kwargs):
         """Custom validation to handle raw_text and file_bytes flags."""
-        if hasattr(obj, "raw_text"):
-            kwargs.setdefault("context", {})
         data = {
             "id": obj.id,
             "filename": obj.filename,
@@ -88,9 +96,9 @@ class DocumentDetailResponse(BaseModel):
             "status": obj.status,
             "error_message": obj.error_message,
             "chunk_count": obj.chunk_count,
-            "has_raw_text": obj.raw_text is not None if hasattr(obj, "raw_text") else False,
-            "has_file_bytes": obj.file_bytes is not None if hasattr(obj, "file_bytes") else False,
-            "chunks": [DocumentChunkResponse.model_validate(c) for c in obj.chunks] if hasattr(obj, "chunks") and obj.chunks else [],
+            "has_raw_text": getattr(obj, "has_raw_text", False),
+            "has_file_bytes": getattr(obj, "has_file_bytes", False),
+            "chunks": [_chunk_to_response(c) for c in obj.chunks] if hasattr(obj, "chunks") and obj.chunks else [],
             "created_at": obj.created_at,
             "updated_at": obj.updated_at,
         }
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class EvalCase(BaseModel):
@@ -63,8 +63,7 @@ class EvalResultResponse(BaseModel):
     status: str
     error_message: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class EvalRunRequest(BaseModel):
@@ -91,8 +90,7 @@ class EvalRunResponse(BaseModel):
     completed_at: Optional[datetime] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class EvalRunDetailResponse(BaseModel):
@@ -112,14 +110,14 @@ class EvalRunDetailResponse(BaseModel):
     completed_at: Optional[datetime] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class EvalRunListResponse(BaseModel):
     """Schema for evaluation run list response."""
 
     eval_runs: list[EvalRunResponse]
-    total: int
+    total: Optional[int] = None
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = None
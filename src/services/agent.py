@@ -1,18 +1,23 @@
 """RAG Agent service with tool calling and structured JSON outputs."""
 
+import asyncio
+import hashlib
 import json
 import logging
+import re
 import time
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import AsyncGenerator, Literal, Optional
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Any, AsyncGenerator, Literal, Optional
 
-from openai import AsyncOpenAI
 from pydantic import BaseModel
+from pydantic_core import from_json
 
 from src.config import get_settings
 from src.schemas.chat import Citation, StreamChunk
+from src.services.openai_client import get_openai_client
 from src.services.retrieval import RetrievalService, RetrievalResult
+from src.services.semantic_cache import semantic_cache
 from src.services.tracing import TracingService
 
 logger = logging.getLogger(__name__)
@@ -82,6 +87,12 @@ class StructuredAnswer(BaseModel):
     confidence: Literal["high", "medium", "low"]
 
 
+class Skeleton(BaseModel):
+    """Outline of an answer, expanded point by point (Skeleton-of-Thought)."""
+
+    points: list[str]
+
+
 # ---------------------------------------------------------------------------
 # Agent response + helpers
 # ---------------------------------------------------------------------------
@@ -119,26 +130,172 @@ Set confidence based on how well the search results support your answer:
 - medium: results partially address the question
 - low: results are tangentially related or sparse"""
 
+# The system prompt and tool definitions form a constant prefix for every
+# request, which OpenAI caches automatically once it is long enough. Keep the
+# system message first and free of per-request text, and route requests that
+# share the prefix to the same cache with a key derived from it.
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+PROMPT_CACHE_KEY = "rag-agent-" + hashlib.sha256(
+    (SYSTEM_PROMPT + json.dumps(TOOLS, sort_keys=True)).encode()
+).hexdigest()[:16]
+
+
+SKELETON_PROMPT = """Before answering, outline the answer to my question as 3-7 short, independent points based on the search results. Each point is a few words; do not answer yet. Return a single point if the answer cannot be split."""
+
+EXPAND_PROMPT = """Here is an outline of the answer:
+{outline}
+
+Write only the part of the answer for point {index} ("{point}") in 1-3 sentences, citing sources with [n] as before. Do not repeat the other points."""
+
+# Outline length limits for Skeleton-of-Thought answers
+SKELETON_MAX_POINTS = 7
+SKELETON_MAX_TOKENS = 200
+EXPAND_MAX_TOKENS = 300
+
+_CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+# Output token budget for final answers. The structured JSON must fit in full,
+# so estimates keep a floor well above the envelope's own tokens.
+ANSWER_MAX_TOKENS = 1500
+ANSWER_BASE_TOKENS = 300
+ANSWER_TOKENS_PER_SOURCE = 100
+ANSWER_TOKENS_PER_QUERY_WORD = 4
+# Short questions with a strong top match are usually definitional
+DEFINITIONAL_MAX_WORDS = 8
+DEFINITIONAL_MIN_SCORE = 0.8
+DEFINITIONAL_MAX_TOKENS = 400
+
+
+def _estimate_max_tokens(message: str, results: list[RetrievalResult]) -> int:
+    """Pick an output token budget from the question length and retrieval."""
+    words = len(message.split())
+    if (
+        words <= DEFINITIONAL_MAX_WORDS
+        and results
+        and max(r.relevance_score for r in results) >= DEFINITIONAL_MIN_SCORE
+    ):
+        return DEFINITIONAL_MAX_TOKENS
+    return min(
+        ANSWER_MAX_TOKENS,
+        ANSWER_BASE_TOKENS
+        + ANSWER_TOKENS_PER_SOURCE * len(results)
+        + ANSWER_TOKENS_PER_QUERY_WORD * words,
+    )
+
+
+# Greetings and thanks with nothing else in the message are answered without
+# retrieval or a model call
+SMALL_TALK_PATTERN = re.compile(
+    r"^\s*(?:hi|hello|hey|hiya|howdy|good (?:morning|afternoon|evening)|"
+    r"thanks|thank you|thx|cheers|bye|goodbye)(?: there)?[\s!.?,]*$",
+    re.IGNORECASE,
+)
+SMALL_TALK_REPLY = (
+    "Hello! Ask me a question about your uploaded documents and I'll answer "
+    "with citations."
+)
+
+
+def intent_is_factual(message: str) -> bool:
+    """Whether a message needs retrieval (anything but a bare greeting/thanks)."""
+    return SMALL_TALK_PATTERN.match(message) is None
+
+
+def _no_context_refusal(tools_called: list[str]) -> AgentResponse:
+    """Refusal returned when retrieval found nothing relevant."""
+    return AgentResponse(
+        content=(
+            "I cannot answer this question based on the available documents. "
+            "The uploaded documents don't appear to contain information relevant "
+            "to your question. Please try uploading relevant documents or asking "
+            "about topics covered in the existing corpus."
+        ),
+        citations=[],
+        is_refusal=True,
+        refusal_reason="No relevant documents found",
+        tools_called=tools_called,
+    )
+
+
+def _combine_answers(
+    parts: list[StructuredAnswer],
+    all_citations: list[Citation],
+    tools_called: list[str],
+    tokens_used: int,
+) -> AgentResponse:
+    """Stitch expanded points into one response with the union of citations."""
+    answered = [part for part in parts if not part.is_refusal]
+    if not answered:
+        return AgentResponse(
+            content=parts[0].answer if parts else "",
+            is_refusal=True,
+            refusal_reason="Insufficient context",
+            tokens_used=tokens_used,
+            confidence=parts[0].confidence if parts else None,
+            tools_called=tools_called,
+        )
+
+    cited_sources = list(dict.fromkeys(i for part in answered for i in part.cited_sources))
+    return AgentResponse(
+        content="\n\n".join(part.answer for part in answered),
+        citations=[
+            all_citations[i - 1] for i in cited_sources if 0 < i <= len(all_citations)
+        ],
+        tokens_used=tokens_used,
+        confidence=min(
+            (part.confidence for part in answered), key=_CONFIDENCE_RANK.__getitem__
+        ),
+        tools_called=tools_called,
+    )
+
 
 def _format_context(results: list[RetrievalResult]) -> str:
     """Format retrieval results into context string for the LLM."""
     if not results:
         return "No relevant documents found."
 
-    context_parts = []
-    for i, result in enumerate(results, 1):
-        page_info = f" (Page {result.page_number})" if result.page_number else ""
-        context_parts.append(
-            f"[Source {i}] From '{result.document_name}'{page_info}:\n{result.content}"
-        )
+    return "\n\n---\n\n".join([
+        f"[Source {i}] From '{result.document_name}'"
+        f"{f' (Page {result.page_number})' if result.page_number else ''}:\n{result.content}"
+        for i, result in enumerate(results, 1)
+    ])
+
+
+# Answers are refused unless at least one retrieved chunk scores this high
+REFUSAL_SCORE_THRESHOLD = 0.3
 
-    return "\n\n---\n\n".join(context_parts)
+
+def _has_relevant_result(results: list[RetrievalResult]) -> bool:
+    """Whether any result clears the refusal threshold.
+
+    Each search returns results sorted by score, so this usually stops at the
+    first element.
+    """
+    return any(r.relevance_score >= REFUSAL_SCORE_THRESHOLD for r in results)
+
+
+def _partial_answer(snapshot: str) -> str:
+    """Return the "answer" field parsed so far from partial structured output JSON."""
+    try:
+        parsed = from_json(snapshot, allow_partial="trailing-strings")
+    except ValueError:
+        return ""
+    answer = parsed.get("answer") if isinstance(parsed, dict) else None
+    return answer if isinstance(answer, str) else ""
+
+
+def _search_key(query: str, top_k: int) -> tuple[str, int]:
+    """Key identifying equivalent searches (case and whitespace ignored)."""
+    return " ".join(query.casefold().split()), top_k
 
 
 def _results_to_citations(results: list[RetrievalResult]) -> list[Citation]:
-    """Convert retrieval results to Citation schema objects."""
+    """Convert retrieval results to Citation schema objects.
+
+    Fields come straight from typed RetrievalResults, so validation is skipped.
+    """
     return [
-        Citation(
+        Citation.model_construct(
             document_id=r.document_id,
             document_name=r.document_name,
             chunk_id=r.chunk_id,
@@ -159,7 +316,7 @@ class RAGAgent:
     """Agentic RAG system using OpenAI tool calling and structured outputs."""
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = settings.openai_model
         self.retrieval_service = RetrievalService()
 
@@ -168,76 +325,198 @@ class RAGAgent:
         message: str,
         max_sources: int,
         tracer: Optional[TracingService],
+        query_embedding: Optional[list[float]] = None,
     ) -> tuple[list[dict], list[RetrievalResult], list[str]]:
         """
         First OpenAI call with tools enabled.  Execute any requested tool calls
         (search_corpus, get_date) and return the updated messages list, all
         retrieval results accumulated, and the names of tools that were called.
         """
+        async for event, payload in self._execute_tool_loop_stream(
+            message, max_sources, tracer, query_embedding
+        ):
+            if event == "done":
+                outcome = payload
+        return outcome
+
+    async def _execute_tool_loop_stream(
+        self,
+        message: str,
+        max_sources: int,
+        tracer: Optional[TracingService],
+        query_embedding: Optional[list[float]] = None,
+    ) -> AsyncGenerator[tuple[str, Any], None]:
+        """Run the tool loop, yielding (event, payload) pairs as it progresses.
+
+        query_embedding, if the message was already embedded (semantic cache
+        lookup), is reused for the prefetch search.
+
+        Events: ("tool_started", tool names) once the model has chosen its
+        tools, ("tool_result", results) per search in request order, and
+        finally ("done", (messages, all_results, tools_called)).
+        """
         messages: list[dict] = [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            SYSTEM_MESSAGE,
             {"role": "user", "content": message},
         ]
 
-        # First call: let the LLM decide which tools to invoke
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=TOOLS,
-            tool_choice="auto",
-            temperature=0.3,
+        # Search for the question as asked while the model decides which tools
+        # to call; reused if it requests the same search, cancelled otherwise
+        prefetch = asyncio.create_task(
+            self.retrieval_service.search(
+                query=message, top_k=max_sources, query_embedding=query_embedding
+            )
         )
+        prefetched = {_search_key(message, max_sources): prefetch}
 
         all_results: list[RetrievalResult] = []
         tools_called: list[str] = []
 
-        if response.choices[0].finish_reason == "tool_calls":
-            tool_calls = response.choices[0].message.tool_calls or []
-            # Append the assistant message with tool_calls so the next call has context
-            messages.append(response.choices[0].message)
-
-            for tc in tool_calls:
-                tools_called.append(tc.function.name)
+        # First call: let the LLM decide which tools to invoke
+        tool_choice_call = asyncio.create_task(
+            self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=TOOLS,
+                tool_choice="auto",
+                temperature=0.3,
+                prompt_cache_key=PROMPT_CACHE_KEY,
+            )
+        )
 
-                if tc.function.name == "search_corpus":
-                    args = json.loads(tc.function.arguments)
-                    retrieval_start = time.time()
-                    results = await self.retrieval_service.search(
-                        query=args["query"],
-                        top_k=args.get("top_k", max_sources),
+        try:
+            # If the question as asked finds nothing relevant, the answer is a
+            # refusal; finish without waiting for the model
+            retrieval_start = time.time()
+            await asyncio.wait({prefetch})
+            if (
+                not prefetch.cancelled()
+                and prefetch.exception() is None
+                and not _has_relevant_result(prefetch.result())
+            ):
+                if tracer:
+                    await tracer.log_retrieval(
+                        query=message,
+                        results=[],
+                        duration_ms=int((time.time() - retrieval_start) * 1000),
                     )
+            else:
+                response = await tool_choice_call
+
+                if response.choices[0].finish_reason == "tool_calls":
+                    tool_calls = response.choices[0].message.tool_calls or []
+                    # Append the assistant message with tool_calls so the next call has context
+                    messages.append(response.choices[0].message)
+                    yield "tool_started", [tc.function.name for tc in tool_calls]
+
+                    # All searches run together (one embedding request and one SQL
+                    # query); tool messages are appended in the order requested
+                    search_args = [
+                        from_json(tc.function.arguments)
+                        if tc.function.name == "search_corpus" else None
+                        for tc in tool_calls
+                    ]
+                    retrieval_start = time.time()
+                    search_results = iter(await self._run_searches(
+                        [
+                            (args["query"], args.get("top_k", max_sources))
+                            for args in search_args if args is not None
+                        ],
+                        prefetched,
+                    ))
                     retrieval_duration = int((time.time() - retrieval_start) * 1000)
-                    all_results.extend(results)
-
-                    if tracer:
-                        await tracer.log_retrieval(
-                            query=args["query"],
-                            results=[
-                                {
-                                    "document_id": r.document_id,
-                                    "document_name": r.document_name,
-                                    "chunk_index": r.chunk_index,
-                                    "score": r.relevance_score,
-                                }
-                                for r in results
-                            ],
-                            duration_ms=retrieval_duration,
-                        )
 
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tc.id,
-                        "content": _format_context(results) if results else "No relevant documents found.",
-                    })
+                    for tc, args in zip(tool_calls, search_args):
+                        tools_called.append(tc.function.name)
+
+                        if args is not None:
+                            results = next(search_results)
+                            all_results.extend(results)
+                            yield "tool_result", results
+
+                            if tracer:
+                                await tracer.log_retrieval(
+                                    query=args["query"],
+                                    results=[
+                                        {
+                                            "document_id": r.document_id,
+                                            "document_name": r.document_name,
+                                            "chunk_index": r.chunk_index,
+                                            "score": r.relevance_score,
+                                        }
+                                        for r in results
+                                    ],
+                                    duration_ms=retrieval_duration,
+                                )
+
+                            content = _format_context(results) if results else "No relevant documents found."
+
+                        elif tc.function.name == "get_date":
+                            content = date.today().isoformat()
+
+                        else:
+                            continue
+
+                        messages.append({
+                            "role": "tool",
+                            "tool_call_id": tc.id,
+                            "content": content,
+                        })
+        finally:
+            if not tool_choice_call.done():
+                tool_choice_call.cancel()
+            if not prefetch.done():
+                prefetch.cancel()
+            elif not prefetch.cancelled():
+                prefetch.exception()  # Mark an unused failure as retrieved
+
+        yield "done", (messages, all_results, tools_called)
+
+    async def _run_searches(
+        self,
+        searches: list[tuple[str, int]],
+        prefetched: dict[tuple[str, int], asyncio.Task],
+    ) -> list[list[RetrievalResult]]:
+        """Run (query, top_k) searches and return their results in order.
+
+        Repeated searches (per _search_key) run once and share their results.
+        Searches matching a prefetched key await that task; the rest are
+        embedded and searched together, one batch per distinct top_k.
+        """
+        positions: dict[tuple[str, int], list[int]] = {}
+        for i, (query, top_k) in enumerate(searches):
+            positions.setdefault(_search_key(query, top_k), []).append(i)
+
+        waits: list[tuple[tuple[str, int], asyncio.Task]] = []
+        batches: dict[int, list[tuple[str, int]]] = {}
+        for key in positions:
+            prefetch = prefetched.get(key)
+            if prefetch is not None:
+                waits.append((key, prefetch))
+            else:
+                batches.setdefault(key[1], []).append(key)
+
+        outputs = await asyncio.gather(
+            *(prefetch for _, prefetch in waits),
+            *(
+                self.retrieval_service.batch_search(
+                    [searches[positions[key][0]][0] for key in keys], top_k=top_k
+                )
+                for top_k, keys in batches.items()
+            ),
+        )
 
-                elif tc.function.name == "get_date":
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tc.id,
-                        "content": datetime.now().strftime("%Y-%m-%d"),
-                    })
+        by_key: dict[tuple[str, int], list[RetrievalResult]] = {}
+        for (key, _), output in zip(waits, outputs):
+            by_key[key] = output
+        for keys, output in zip(batches.values(), outputs[len(waits):]):
+            by_key.update(zip(keys, output))
 
-        return messages, all_results, tools_called
+        results: list[list[RetrievalResult]] = [[] for _ in searches]
+        for key, indexes in positions.items():
+            for i in indexes:
+                results[i] = by_key[key]
+        return results
 
     async def chat(
         self,
@@ -245,41 +524,95 @@ class RAGAgent:
         session_id: str,
         max_sources: int = 5,
         tracer: Optional[TracingService] = None,
+        use_cache: bool = True,
     ) -> AgentResponse:
-        """Process a chat message using tool calling + structured outputs."""
-        start_time = time.time()
+        """Process a chat message using tool calling + structured outputs.
+
+        Answers are reused for near-identical questions from the semantic
+        cache unless use_cache is False.
+        """
+        if not intent_is_factual(message):
+            return AgentResponse(content=SMALL_TALK_REPLY)
+
+        query_embedding = None
+        if use_cache and settings.semantic_cache_size > 0:
+            query_embedding, cached = await self._lookup_cached_response(
+                message, max_sources, tracer
+            )
+            if cached is not None:
+                return cached
+
+        response = await self._answer(message, max_sources, tracer, query_embedding)
+
+        if query_embedding is not None:
+            semantic_cache.set(query_embedding, response, key=max_sources)
+        return response
+
+    async def _lookup_cached_response(
+        self,
+        message: str,
+        max_sources: int,
+        tracer: Optional[TracingService],
+    ) -> tuple[Optional[list[float]], Optional[AgentResponse]]:
+        """Embed the question and look it up in the semantic cache.
 
+        Returns the embedding (None if it could not be computed, so the answer
+        is not cached) and a copy of the cached response on a hit.
+        """
+        lookup_start = time.time()
+        try:
+            query_embedding = await self.retrieval_service.generate_embedding(message)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup skipped: {e}")
+            return None, None
+
+        hit = semantic_cache.get(query_embedding, key=max_sources)
+        if tracer:
+            await tracer.log_tool_call(
+                tool_name="semantic_cache",
+                tool_args={"max_sources": max_sources},
+                tool_output={
+                    "hit": hit is not None,
+                    "similarity": hit[1] if hit else None,
+                    "hits": semantic_cache.hits,
+                    "misses": semantic_cache.misses,
+                },
+                duration_ms=int((time.time() - lookup_start) * 1000),
+            )
+        if hit is None:
+            return query_embedding, None
+        # No model call was made for this answer
+        return query_embedding, replace(hit[0], tokens_used=0)
+
+    async def _answer(
+        self,
+        message: str,
+        max_sources: int,
+        tracer: Optional[TracingService],
+        query_embedding: Optional[list[float]] = None,
+    ) -> AgentResponse:
+        """Run retrieval and the model calls for one question."""
         # Step 1: Tool calling loop (LLM decides when/how to search)
         messages, results, tools_called = await self._execute_tool_loop(
-            message, max_sources, tracer
+            message, max_sources, tracer, query_embedding
         )
 
         # Step 2: Refusal check — no relevant context found
-        if not results or all(r.relevance_score < 0.3 for r in results):
-            return AgentResponse(
-                content=(
-                    "I cannot answer this question based on the available documents. "
-                    "The uploaded documents don't appear to contain information relevant "
-                    "to your question. Please try uploading relevant documents or asking "
-                    "about topics covered in the existing corpus."
-                ),
-                citations=[],
-                is_refusal=True,
-                refusal_reason="No relevant documents found",
-                tools_called=tools_called,
-            )
+        if not _has_relevant_result(results):
+            return _no_context_refusal(tools_called)
 
         all_citations = _results_to_citations(results)
 
         # Step 3: Structured output call — LLM formats final answer as JSON
         model_start = time.time()
         try:
-            completion = await self.client.beta.chat.completions.parse(
+            completion = await self.client.chat.completions.parse(
                 model=self.model,
                 messages=messages,
                 response_format=StructuredAnswer,
                 temperature=0.3,
-                max_tokens=1500,
+                prompt_cache_key=PROMPT_CACHE_KEY,
+                max_tokens=_estimate_max_tokens(message, results),
             )
             model_duration = int((time.time() - model_start) * 1000)
             structured = completion.choices[0].message.parsed
@@ -320,26 +653,142 @@ class RAGAgent:
                 await tracer.log_error(f"LLM call failed: {e}")
             raise
 
-    async def chat_stream(
+    async def chat_sot(
         self,
         message: str,
         session_id: str,
         max_sources: int = 5,
         tracer: Optional[TracingService] = None,
-    ) -> AsyncGenerator[StreamChunk, None]:
-        """Stream a chat response. Tool loop runs first, then streams final answer."""
-        # Step 1: Tool calling loop (synchronous — tools must complete before streaming)
+    ) -> AgentResponse:
+        """Answer with Skeleton-of-Thought: outline the answer first, then
+        expand every point in parallel and join the parts.
+
+        Falls back to a single structured answer when the outline has fewer
+        than two points.
+        """
+        if not intent_is_factual(message):
+            return AgentResponse(content=SMALL_TALK_REPLY)
+
         messages, results, tools_called = await self._execute_tool_loop(
             message, max_sources, tracer
         )
 
-        # Send citations up front so the UI can render them immediately
-        citations = _results_to_citations(results)
-        for citation in citations:
-            yield StreamChunk(type="citation", citation=citation)
+        if not _has_relevant_result(results):
+            return _no_context_refusal(tools_called)
+
+        all_citations = _results_to_citations(results)
+
+        try:
+            skeleton, tokens_used = await self._structured_call(
+                messages + [{"role": "user", "content": SKELETON_PROMPT}],
+                Skeleton,
+                SKELETON_MAX_TOKENS,
+                tracer,
+            )
+            points = skeleton.points[:SKELETON_MAX_POINTS]
+
+            if len(points) < 2:
+                part, part_tokens = await self._structured_call(
+                    messages,
+                    StructuredAnswer,
+                    _estimate_max_tokens(message, results),
+                    tracer,
+                )
+                return _combine_answers(
+                    [part], all_citations, tools_called, tokens_used + part_tokens
+                )
+
+            outline = "\n".join(f"{i}. {point}" for i, point in enumerate(points, 1))
+            expanded = await asyncio.gather(
+                *(
+                    self._structured_call(
+                        messages + [{
+                            "role": "user",
+                            "content": EXPAND_PROMPT.format(
+                                outline=outline, index=i, point=point
+                            ),
+                        }],
+                        StructuredAnswer,
+                        EXPAND_MAX_TOKENS,
+                        tracer,
+                    )
+                    for i, point in enumerate(points, 1)
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"LLM call failed: {e}")
+            if tracer:
+                await tracer.log_error(f"LLM call failed: {e}")
+            raise
+
+        return _combine_answers(
+            [part for part, _ in expanded],
+            all_citations,
+            tools_called,
+            tokens_used + sum(part_tokens for _, part_tokens in expanded),
+        )
+
+    async def _structured_call(
+        self,
+        messages: list,
+        response_format: type[BaseModel],
+        max_tokens: int,
+        tracer: Optional[TracingService],
+    ) -> tuple[BaseModel, int]:
+        """Make one structured output call; returns the parsed object and
+        the total tokens used."""
+        model_start = time.time()
+        completion = await self.client.chat.completions.parse(
+            model=self.model,
+            messages=messages,
+            response_format=response_format,
+            temperature=0.3,
+            prompt_cache_key=PROMPT_CACHE_KEY,
+            max_tokens=max_tokens,
+        )
+        parsed = completion.choices[0].message.parsed
+
+        if tracer:
+            await tracer.log_model_call(
+                model=self.model,
+                messages=messages,
+                response=parsed.model_dump_json() if parsed else "",
+                tokens_in=completion.usage.prompt_tokens if completion.usage else 0,
+                tokens_out=completion.usage.completion_tokens if completion.usage else 0,
+                duration_ms=int((time.time() - model_start) * 1000),
+            )
+
+        if parsed is None:
+            raise ValueError("Structured output parsing returned None")
+        return parsed, completion.usage.total_tokens if completion.usage else 0
+
+    async def chat_stream(
+        self,
+        message: str,
+        session_id: str,
+        max_sources: int = 5,
+        tracer: Optional[TracingService] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """Stream a chat response. Tool loop runs first, then streams final answer."""
+        if not intent_is_factual(message):
+            yield StreamChunk(type="content", content=SMALL_TALK_REPLY)
+            return
+
+        # Step 1: Tool calling loop. Progress and citations are sent as they
+        # become available so the UI can render them before the answer starts.
+        yield StreamChunk(type="status", content="searching")
+        async for event, payload in self._execute_tool_loop_stream(
+            message, max_sources, tracer
+        ):
+            if event == "tool_result":
+                for citation in _results_to_citations(payload):
+                    yield StreamChunk(type="citation", citation=citation)
+            elif event == "done":
+                messages, results, tools_called = payload
 
         # Step 2: Refusal check
-        if not results or all(r.relevance_score < 0.3 for r in results):
+        if not _has_relevant_result(results):
             yield StreamChunk(
                 type="content",
                 content=(
@@ -349,39 +798,55 @@ class RAGAgent:
             )
             return
 
-        # Step 3: Stream final response
-        # (Structured outputs are not used here — they require accumulating the full
-        # response before parsing, which defeats the purpose of streaming.)
+        # Step 3: Stream the structured answer, forwarding the "answer" field
+        # as it grows; the full object is validated once the stream completes
         model_start = time.time()
-        full_content = ""
+        sent = ""
 
         try:
-            stream = await self.client.chat.completions.create(
+            async with self.client.chat.completions.stream(
                 model=self.model,
                 messages=messages,
+                response_format=StructuredAnswer,
                 temperature=0.3,
-                max_tokens=1500,
-                stream=True,
-            )
-
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_content += content
-                    yield StreamChunk(type="content", content=content)
+                prompt_cache_key=PROMPT_CACHE_KEY,
+                max_tokens=_estimate_max_tokens(message, results),
+                stream_options={"include_usage": True},
+            ) as stream:
+                async for event in stream:
+                    if event.type != "content.delta":
+                        continue
+                    answer = _partial_answer(event.snapshot)
+                    if len(answer) > len(sent) and answer.startswith(sent):
+                        # Fields are known-good; skip validation on the per-token path
+                        yield StreamChunk.model_construct(
+                            type="content", content=answer[len(sent):]
+                        )
+                        sent = answer
+                completion = await stream.get_final_completion()
 
             model_duration = int((time.time() - model_start) * 1000)
+            structured = completion.choices[0].message.parsed
 
             if tracer:
                 await tracer.log_model_call(
                     model=self.model,
                     messages=messages,
-                    response=full_content,
-                    tokens_in=0,  # Not available in streaming mode
-                    tokens_out=0,
+                    response=structured.answer if structured else sent,
+                    tokens_in=completion.usage.prompt_tokens if completion.usage else 0,
+                    tokens_out=completion.usage.completion_tokens if completion.usage else 0,
                     duration_ms=model_duration,
                 )
 
+            if structured is None:
+                raise ValueError("Structured output parsing returned None")
+
+            if len(structured.answer) > len(sent) and structured.answer.startswith(sent):
+                yield StreamChunk.model_construct(
+                    type="content", content=structured.answer[len(sent):]
+                )
+            yield StreamChunk(type="meta", confidence=structured.confidence)
+
         except Exception as e:
             logger.error(f"Stream error: {e}")
             if tracer:
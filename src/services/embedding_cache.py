@@ -0,0 +1,112 @@
+"""On-disk cache of document embeddings keyed by model and text."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Keys per lookup statement, below SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """Persistent map from sha256(model, text) to an embedding.
+
+    Backed by a SQLite file in WAL mode, so worker processes on one host share
+    it and it survives restarts. Vectors are stored as float32 bytes. Methods
+    block on disk I/O (call them via asyncio.to_thread); failures are logged
+    and treated as misses so ingestion never depends on the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def get_many(self, model: str, texts: list[str]) -> list[Optional[list[float]]]:
+        """Return the cached embedding for each text, or None where missing."""
+        keys = [_cache_key(model, text) for text in texts]
+        found: dict[bytes, bytes] = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                for i in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                    batch = keys[i : i + LOOKUP_BATCH_SIZE]
+                    rows = conn.execute(
+                        "SELECT key, vector FROM embeddings WHERE key IN "
+                        f"({','.join('?' * len(batch))})",
+                        batch,
+                    )
+                    found.update(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+        return [
+            (
+                np.frombuffer(found[key], dtype=np.float32).tolist()
+                if key in found
+                else None
+            )
+            for key in keys
+        ]
+
+    def set_many(
+        self, model: str, texts: list[str], embeddings: list[list[float]]
+    ) -> None:
+        """Store embeddings for texts, replacing existing entries."""
+        rows = [
+            (_cache_key(model, text), np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        rows,
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def close(self) -> None:
+        """Close the database connection (reopened on next use)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the cache database on first use. Caller holds the lock."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+
+def _cache_key(model: str, text: str) -> bytes:
+    """Hash of the model name and text; the NUL separator keeps pairs distinct."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+# Shared by all ingestion in this worker; disabled when no path is configured
+embedding_cache: Optional[EmbeddingCache] = (
+    EmbeddingCache(settings.embedding_cache_path)
+    if settings.embedding_cache_path
+    else None
+)
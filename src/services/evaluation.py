@@ -1,36 +1,120 @@
 """Evaluation service for running test suites and computing metrics."""
 
-import json
+import asyncio
 import logging
+import re
 import time
-import uuid
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
-from sqlalchemy import select
+from pydantic_core import from_json
+from sqlalchemy import insert, select, update
 
 from src.config import get_settings
 from src.database import get_db_context
 from src.models.eval_run import EvalResult, EvalRun
 from src.schemas.eval import EvalCase, EvalDataset
 from src.services.agent import RAGAgent
-from src.services.tracing import TracingService
+from src.services.tracing import TracingService, generate_id
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+DATASETS_DIR = Path("eval_datasets")
+
+# Refusal answers start with this phrase; matching only the prefix avoids
+# lowercasing the whole answer
+REFUSAL_PREFIX_PATTERN = re.compile(r"i cannot answer", re.IGNORECASE)
+
+# Groundedness scoring: sentence boundaries, [N] citation markers, and
+# introductory sentences that don't need a citation
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+')
+CITATION_MARKER_PATTERN = re.compile(r'\[\d+\]')
+TRANSITIONAL_PATTERN = re.compile(
+    r'^(here|in summary|based on|according to|overall|to summarize|'
+    r'in conclusion|additionally|furthermore|the following)',
+    re.IGNORECASE,
+)
+
+# Hallucination check: citation markers [1]-[5], and space-delimited words
+# that indicate a factual claim (more than CLAIM_INDICATOR_LIMIT distinct ones
+# without citations counts as a hallucination)
+LOW_CITATION_MARKER_PATTERN = re.compile(r'\[[1-5]\]')
+CLAIM_INDICATOR_PATTERN = re.compile(r'(?<= )(?:is|are|was|were|the|this)(?= )', re.IGNORECASE)
+CLAIM_INDICATOR_LIMIT = 3
+
+
+@lru_cache(maxsize=128)
+def _read_dataset(path: str, mtime_ns: int) -> EvalDataset:
+    """Parse a dataset file. Cached per (path, mtime) so edits are picked up."""
+    with open(path, "rb") as f:
+        return EvalDataset.model_validate_json(f.read())
+
+
+@lru_cache(maxsize=128)
+def _read_dataset_info(path: str, mtime_ns: int) -> dict:
+    """Read the listing summary of a dataset file. Cached per (path, mtime)."""
+    file_path = Path(path)
+    with open(file_path, "rb") as f:
+        data = from_json(f.read())
+    return {
+        "name": file_path.stem,
+        "filename": file_path.name,
+        "description": data.get("description", ""),
+        "case_count": len(data.get("cases", [])),
+    }
+
+
+def load_dataset(dataset_name: str) -> EvalDataset:
+    """Load an evaluation dataset by name."""
+    dataset_path = DATASETS_DIR / f"{dataset_name}.json"
+    if not dataset_path.exists():
+        raise FileNotFoundError(f"Dataset not found: {dataset_name}")
+    return _read_dataset(str(dataset_path), dataset_path.stat().st_mtime_ns)
+
+
+def list_dataset_infos() -> list[dict]:
+    """List summaries of all available evaluation datasets."""
+    datasets = []
+    if DATASETS_DIR.exists():
+        for file_path in DATASETS_DIR.glob("*.json"):
+            try:
+                datasets.append(
+                    _read_dataset_info(str(file_path), file_path.stat().st_mtime_ns)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to read dataset {file_path}: {e}")
+    return datasets
+
 
 class EvaluationService:
     """Service for running evaluations and computing metrics."""
 
-    def __init__(self):
+    def __init__(self, agent: Optional[RAGAgent] = None):
         self.batch_size = settings.eval_batch_size
         self.timeout = settings.eval_timeout_seconds
+        self._agent = agent
+        self._cancel_flags: dict[int, asyncio.Event] = {}
+
+    def cancel(self, eval_run_id: int) -> None:
+        """Signal a run executing in this worker to stop after its current batch."""
+        cancel_flag = self._cancel_flags.get(eval_run_id)
+        if cancel_flag is not None:
+            cancel_flag.set()
 
     async def run_evaluation(self, eval_run_id: int) -> None:
         """Run an evaluation asynchronously."""
+        cancel_flag = self._cancel_flags.setdefault(eval_run_id, asyncio.Event())
+        try:
+            await self._run_evaluation(eval_run_id, cancel_flag)
+        finally:
+            self._cancel_flags.pop(eval_run_id, None)
+
+    async def _run_evaluation(self, eval_run_id: int, cancel_flag: asyncio.Event) -> None:
+        """Run all cases of an evaluation and store results and metrics."""
         async with get_db_context() as db:
             # Get eval run
             result = await db.execute(
@@ -52,33 +136,57 @@ class EvaluationService:
                 dataset = await self._load_dataset(eval_run.dataset_name)
 
                 # Run evaluation cases
-                latencies = []
-                groundedness_scores = []
-                hallucination_count = 0
-                schema_compliant_count = 0
-                tool_correct_count = 0
                 total_cases = len(dataset.cases)
-
-                agent = RAGAgent()
-
-                for i, case in enumerate(dataset.cases):
-                    # Check if cancelled
-                    await db.refresh(eval_run)
-                    if eval_run.status == "cancelled":
-                        logger.info(f"Eval run {eval_run_id} was cancelled")
-                        return
-
-                    try:
-                        result_data = await self._run_single_case(agent, case)
-
-                        # Create result record
-                        eval_result = EvalResult(
-                            eval_run_id=eval_run.id,
-                            case_id=case.case_id,
-                            question=case.question,
-                            expected_answer=case.expected_answer,
+                # Per-case metrics of successful cases, filled up to scored_count
+                latencies = np.empty(total_cases, dtype=np.int64)
+                groundedness_scores = np.empty(total_cases, dtype=np.float64)
+                # Columns: hallucination, schema compliant, tool calls correct
+                case_flags = np.zeros((total_cases, 3), dtype=bool)
+                scored_count = 0
+
+                # Built once and reused by later runs when none was injected
+                if self._agent is None:
+                    self._agent = RAGAgent()
+                agent = self._agent
+
+                # Cases in a batch run concurrently; each batch is committed
+                # together and cancellation is checked between batches
+                for start in range(0, total_cases, self.batch_size):
+                    batch = dataset.cases[start:start + self.batch_size]
+                    outcomes = await asyncio.gather(
+                        *(self._run_single_case(agent, case) for case in batch),
+                        return_exceptions=True,
+                    )
+
+                    # Rows for one executemany INSERT; every row has the same keys
+                    eval_results = []
+                    for case, result_data in zip(batch, outcomes):
+                        row = {
+                            "eval_run_id": eval_run.id,
+                            "case_id": case.case_id,
+                            "question": case.question,
+                            "expected_answer": case.expected_answer,
+                            "actual_answer": None,
+                            "citations": None,
+                            "groundedness_score": None,
+                            "hallucination_detected": None,
+                            "schema_compliant": None,
+                            "tool_calls_correct": None,
+                            "latency_ms": None,
+                            "status": "error",
+                            "error_message": None,
+                        }
+                        eval_results.append(row)
+                        if isinstance(result_data, Exception):
+                            logger.error(f"Case {case.case_id} failed: {result_data}")
+                            row["error_message"] = str(result_data)
+                            continue
+                        if isinstance(result_data, BaseException):
+                            raise result_data
+
+                        row.update(
                             actual_answer=result_data["answer"],
-                            citations=json.dumps(result_data["citations"]),
+                            citations=result_data["citations"],
                             groundedness_score=result_data["groundedness"],
                             hallucination_detected=result_data["hallucination"],
                             schema_compliant=result_data["schema_compliant"],
@@ -86,41 +194,51 @@ class EvaluationService:
                             latency_ms=result_data["latency_ms"],
                             status="passed" if result_data["passed"] else "failed",
                         )
-                        db.add(eval_result)
 
                         # Aggregate metrics
-                        latencies.append(result_data["latency_ms"])
-                        groundedness_scores.append(result_data["groundedness"])
-                        if result_data["hallucination"]:
-                            hallucination_count += 1
-                        if result_data["schema_compliant"]:
-                            schema_compliant_count += 1
-                        if result_data["tool_correct"]:
-                            tool_correct_count += 1
-
-                    except Exception as e:
-                        logger.error(f"Case {case.case_id} failed: {e}")
-                        eval_result = EvalResult(
-                            eval_run_id=eval_run.id,
-                            case_id=case.case_id,
-                            question=case.question,
-                            expected_answer=case.expected_answer,
-                            status="error",
-                            error_message=str(e),
+                        latencies[scored_count] = result_data["latency_ms"]
+                        groundedness_scores[scored_count] = result_data["groundedness"]
+                        case_flags[scored_count] = (
+                            result_data["hallucination"],
+                            result_data["schema_compliant"],
+                            result_data["tool_correct"],
                         )
-                        db.add(eval_result)
-
-                    eval_run.completed_cases = i + 1
+                        scored_count += 1
+
+                    await db.execute(insert(EvalResult), eval_results)
+                    # Targeted progress UPDATE; the returned status also reports
+                    # a cancel handled by another worker
+                    progress = await db.execute(
+                        update(EvalRun)
+                        .where(EvalRun.id == eval_run_id)
+                        .values(completed_cases=start + len(batch))
+                        .returning(EvalRun.status)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if progress.scalar_one() == "cancelled":
+                        cancel_flag.set()
                     await db.commit()
 
+                    if cancel_flag.is_set():
+                        logger.info(f"Eval run {eval_run_id} was cancelled")
+                        return
+
                 # Calculate final metrics
-                if latencies:
-                    eval_run.latency_p95_ms = float(np.percentile(latencies, 95))
-                if groundedness_scores:
-                    eval_run.groundedness_score = float(np.mean(groundedness_scores))
-                eval_run.hallucination_rate = hallucination_count / total_cases if total_cases > 0 else 0
-                eval_run.schema_compliance = schema_compliant_count / total_cases if total_cases > 0 else 0
-                eval_run.tool_correctness = tool_correct_count / total_cases if total_cases > 0 else 0
+                if scored_count:
+                    # np.percentile selects with a partial sort, not a full sort
+                    eval_run.latency_p95_ms = float(
+                        np.percentile(latencies[:scored_count], 95)
+                    )
+                    eval_run.groundedness_score = float(
+                        groundedness_scores[:scored_count].mean()
+                    )
+                # Rates are over all cases; errored cases count as False for each flag
+                rates = case_flags.sum(axis=0) / max(total_cases, 1)
+                (
+                    eval_run.hallucination_rate,
+                    eval_run.schema_compliance,
+                    eval_run.tool_correctness,
+                ) = rates.tolist()
 
                 eval_run.status = "completed"
                 eval_run.completed_at = datetime.utcnow()
@@ -136,22 +254,17 @@ class EvaluationService:
                 await db.commit()
 
     async def _load_dataset(self, dataset_name: str) -> EvalDataset:
-        """Load an evaluation dataset."""
-        dataset_path = Path("eval_datasets") / f"{dataset_name}.json"
-        if not dataset_path.exists():
-            raise FileNotFoundError(f"Dataset not found: {dataset_name}")
-
-        with open(dataset_path) as f:
-            data = json.load(f)
-
-        return EvalDataset(**data)
+        """Load an evaluation dataset without blocking the event loop."""
+        return await asyncio.to_thread(load_dataset, dataset_name)
 
     async def _run_single_case(self, agent: RAGAgent, case: EvalCase) -> dict:
         """Run a single evaluation case and compute metrics."""
-        run_id = str(uuid.uuid4())
+        run_id = generate_id()
         session_id = f"eval_{run_id}"
         tracer = TracingService(run_id=run_id, session_id=session_id)
 
+        # Measured while the rest of the batch shares the agent and its
+        # connection pools, so it includes contention at eval_batch_size
         start_time = time.time()
 
         try:
@@ -159,6 +272,7 @@ class EvaluationService:
                 message=case.question,
                 session_id=session_id,
                 tracer=tracer,
+                use_cache=False,  # Measure the full pipeline on every case
             )
             latency_ms = int((time.time() - start_time) * 1000)
 
@@ -200,43 +314,34 @@ class EvaluationService:
 
     def _compute_groundedness(self, answer: str, citations: list) -> float:
         """Compute groundedness score (0-1) based on citation coverage of claims."""
-        import re
-
         if not answer:
             return 0.0
 
         if not citations:
             return 0.0
 
-        # Split into sentences (skip very short fragments under 10 chars)
-        sentences = [
-            s.strip()
-            for s in re.split(r'(?<=[.!?])\s+', answer)
-            if s.strip() and len(s.strip()) > 10
-        ]
-
-        if not sentences:
+        # One pass over the sentences (skipping fragments of 10 chars or less),
+        # counting those with a citation marker [N] and transitional/introductory
+        # sentences that don't need citations
+        sentence_count = cited_sentences = transitional_count = 0
+        for sentence in SENTENCE_SPLIT_PATTERN.split(answer):
+            sentence = sentence.strip()
+            if len(sentence) <= 10:
+                continue
+            sentence_count += 1
+            if CITATION_MARKER_PATTERN.search(sentence):
+                cited_sentences += 1
+            if TRANSITIONAL_PATTERN.match(sentence):
+                transitional_count += 1
+
+        if not sentence_count:
             # Very short answer — check if it has any citation marker
-            if re.search(r'\[\d+\]', answer):
+            if CITATION_MARKER_PATTERN.search(answer):
                 return 0.8
             return 0.3
 
-        # Count sentences that contain at least one citation marker [N]
-        citation_pattern = re.compile(r'\[\d+\]')
-        cited_sentences = sum(1 for s in sentences if citation_pattern.search(s))
-
-        # Recognize transitional/introductory sentences that don't need citations
-        transitional_pattern = re.compile(
-            r'^(here|in summary|based on|according to|overall|to summarize|'
-            r'in conclusion|additionally|furthermore|the following)',
-            re.IGNORECASE,
-        )
-        transitional_count = sum(
-            1 for s in sentences if transitional_pattern.match(s)
-        )
-
         # Effective sentences that SHOULD have citations
-        claimable_sentences = max(len(sentences) - transitional_count, 1)
+        claimable_sentences = max(sentence_count - transitional_count, 1)
 
         # Coverage ratio
         coverage = min(cited_sentences / claimable_sentences, 1.0)
@@ -255,20 +360,21 @@ class EvaluationService:
             return False
 
         # If response is a refusal, it's not hallucination
-        if answer.lower().startswith("i cannot answer"):
+        if REFUSAL_PREFIX_PATTERN.match(answer):
             return False
 
         # If no citations but claims to have information, likely hallucination
-        if not citations and len(answer) > 100:
-            citation_markers = ["[1]", "[2]", "[3]", "[4]", "[5]"]
-            if not any(marker in answer for marker in citation_markers):
-                # Check if making factual claims without sources
-                claim_indicators = ["is", "are", "was", "were", "the", "this"]
-                claim_count = sum(
-                    1 for indicator in claim_indicators
-                    if f" {indicator} " in answer.lower()
-                )
-                if claim_count > 3:
+        if (
+            not citations
+            and len(answer) > 100
+            and not LOW_CITATION_MARKER_PATTERN.search(answer)
+        ):
+            # Check if making factual claims without sources; one scan,
+            # stopping once enough distinct indicators are seen
+            indicators_seen = set()
+            for match in CLAIM_INDICATOR_PATTERN.finditer(answer):
+                indicators_seen.add(match.group().lower())
+                if len(indicators_seen) > CLAIM_INDICATOR_LIMIT:
                     return True
 
         return False
@@ -280,7 +386,7 @@ class EvaluationService:
             return False
 
         # If it's a refusal, should have refusal flag
-        if response.content.lower().startswith("i cannot answer"):
+        if REFUSAL_PREFIX_PATTERN.match(response.content):
             return response.is_refusal
 
         # Non-refusal should have citations
@@ -1,21 +1,71 @@
 """Document ingestion service - parsing, chunking, and embedding with pgvector."""
 
+import asyncio
 import io
 import logging
+import multiprocessing
 import re
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
-from openai import AsyncOpenAI
-from sqlalchemy import select, delete
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import undefer
 
 from src.config import get_settings
 from src.database import get_db_context
 from src.models.document import Document, DocumentChunk
+from src.services.embedding_cache import embedding_cache
+from src.services.openai_client import get_openai_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Inputs per embeddings request (OpenAI limit) and requests in flight per worker
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_CONCURRENCY = 8
+
+# Page markers inserted by PDF extraction, e.g. "[Page 3]"
+PAGE_MARKER_PATTERN = re.compile(r'\[Page (\d+)\]')
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for CPU-bound document parsing."""
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the document parsing process pool, if it was started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def _extract_pdf_text(file_bytes: bytes) -> str:
+    """Extract text from PDF bytes. Runs in a parse pool worker process."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(file_bytes))
+    text_parts = []
+
+    for page_num, page in enumerate(reader.pages, 1):
+        page_text = page.extract_text() or ""
+        if page_text.strip():
+            text_parts.append(f"[Page {page_num}]\n{page_text}")
+
+    return "\n\n".join(text_parts)
+
 
 class IngestionService:
     """Service for ingesting and processing documents into pgvector."""
@@ -23,15 +73,27 @@ class IngestionService:
     def __init__(self):
         self.chunk_size = settings.chunk_size
         self.chunk_overlap = settings.chunk_overlap
-        self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.openai_client = get_openai_client()
+        # Shared by all documents processed through this instance
+        self._embedding_semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
 
-    async def process_document(self, document_id: int) -> None:
-        """Process a document: parse, chunk, embed, and store in Postgres."""
+    async def process_document(
+        self,
+        document_id: int,
+        file_bytes: Optional[bytes] = None,
+    ) -> None:
+        """Process a document: parse, chunk, embed, and store in Postgres.
+
+        If file_bytes is given it is parsed directly instead of the stored content.
+        """
         async with get_db_context() as db:
-            # Get document
-            result = await db.execute(
-                select(Document).where(Document.id == document_id)
-            )
+            # Get document; stored content is only needed without uploaded bytes
+            query = select(Document).where(Document.id == document_id)
+            if file_bytes is None:
+                query = query.options(
+                    undefer(Document.raw_text), undefer(Document.file_bytes)
+                )
+            result = await db.execute(query)
             document = result.scalar_one_or_none()
 
             if not document:
@@ -42,8 +104,11 @@ class IngestionService:
                 document.status = "processing"
                 await db.commit()
 
-                # Parse document content from stored bytes or file
-                content = await self._parse_document(document)
+                # Parse document content from uploaded bytes, stored bytes, or raw text
+                if file_bytes is not None:
+                    content = await self._parse_bytes(file_bytes, document.content_type)
+                else:
+                    content = await self._parse_document(document)
 
                 # Store raw text
                 document.raw_text = content
@@ -53,8 +118,11 @@ class IngestionService:
                     delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
                 )
 
-                # Chunk the content
-                chunks = self._chunk_text(content, document.original_filename)
+                # Chunk the content in a thread so the event loop keeps serving
+                # other requests while large documents are split
+                chunks = await asyncio.to_thread(
+                    self._chunk_text, content, document.original_filename
+                )
 
                 if not chunks:
                     document.status = "completed"
@@ -65,21 +133,23 @@ class IngestionService:
                 # Generate embeddings
                 embeddings = await self._generate_embeddings([c["content"] for c in chunks])
 
-                # Store chunks with embeddings
-                db_chunks = []
-                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                    db_chunk = DocumentChunk(
-                        document_id=document.id,
-                        chunk_index=chunk["chunk_index"],
-                        content=chunk["content"],
-                        start_char=chunk["start_char"],
-                        end_char=chunk["end_char"],
-                        page_number=chunk["page_number"],
-                        embedding=embedding,
-                    )
-                    db_chunks.append(db_chunk)
-
-                db.add_all(db_chunks)
+                # Store chunks with embeddings in one executemany INSERT
+                # (batched by insertmanyvalues, no per-row RETURNING)
+                await db.execute(
+                    insert(DocumentChunk),
+                    [
+                        {
+                            "document_id": document.id,
+                            "chunk_index": chunk["chunk_index"],
+                            "content": chunk["content"],
+                            "start_char": chunk["start_char"],
+                            "end_char": chunk["end_char"],
+                            "page_number": chunk["page_number"],
+                            "embedding": embedding,
+                        }
+                        for chunk, embedding in zip(chunks, embeddings)
+                    ],
+                )
                 document.status = "completed"
                 document.chunk_count = len(chunks)
                 await db.commit()
@@ -99,25 +169,12 @@ class IngestionService:
         file_bytes: bytes,
         content_type: str,
     ) -> None:
-        """Process a document from raw bytes."""
-        async with get_db_context() as db:
-            result = await db.execute(
-                select(Document).where(Document.id == document_id)
-            )
-            document = result.scalar_one_or_none()
-
-            if not document:
-                logger.error(f"Document {document_id} not found")
-                return
+        """Process a freshly uploaded document from its raw bytes.
 
-            # Store raw file bytes if enabled and under size limit
-            if settings.store_raw_files and len(file_bytes) <= settings.max_file_size_bytes:
-                document.file_bytes = file_bytes
-
-            await db.commit()
-
-        # Now process the document
-        await self.process_document(document_id)
+        The upload endpoint already persisted file_bytes (when enabled), so the
+        bytes are parsed directly rather than written and re-read from the row.
+        """
+        await self.process_document(document_id, file_bytes=file_bytes)
 
     async def _parse_document(self, document: Document) -> str:
         """Parse document content from stored bytes or raw_text."""
@@ -127,45 +184,34 @@ class IngestionService:
 
         # Parse from stored file_bytes
         if document.file_bytes:
-            return self._parse_bytes(document.file_bytes, document.content_type)
+            return await self._parse_bytes(document.file_bytes, document.content_type)
 
         raise ValueError("No content available to parse")
 
-    def _parse_bytes(self, file_bytes: bytes, content_type: str) -> str:
+    async def _parse_bytes(self, file_bytes: bytes, content_type: str) -> str:
         """Parse content from bytes based on content type."""
         if content_type == "text/plain" or content_type == "text/markdown":
             return file_bytes.decode("utf-8")
         elif content_type == "application/pdf":
-            return self._parse_pdf_bytes(file_bytes)
+            # PDF extraction is CPU-bound; run it in a worker process
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_parse_pool(), _extract_pdf_text, file_bytes
+            )
         else:
             raise ValueError(f"Unsupported content type: {content_type}")
 
-    def _parse_pdf_bytes(self, file_bytes: bytes) -> str:
-        """Parse PDF from bytes."""
-        try:
-            from pypdf import PdfReader
-
-            reader = PdfReader(io.BytesIO(file_bytes))
-            text_parts = []
-
-            for page_num, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text() or ""
-                if page_text.strip():
-                    text_parts.append(f"[Page {page_num}]\n{page_text}")
-
-            return "\n\n".join(text_parts)
-        except Exception as e:
-            logger.error(f"PDF parsing error: {e}")
-            raise
-
     def _chunk_text(self, text: str, source_name: str) -> list[dict]:
         """Split text into overlapping chunks."""
-        # Clean text
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Clean text (collapse whitespace runs, including newlines)
+        text = " ".join(text.split())
 
         if not text:
             return []
 
+        # Sentence boundaries, found once; each window bisects into them
+        periods = [match.start() for match in re.finditer(r'\.', text)]
+
         chunks = []
         start = 0
         chunk_index = 0
@@ -174,12 +220,10 @@ class IngestionService:
             # Find end position
             end = start + self.chunk_size
 
-            # If not at the end, try to break at a sentence boundary
+            # If not at the end, try to break at the last sentence ending in the window
             if end < len(text):
-                # Look for sentence endings
-                last_period = text.rfind('.', start, end)
-                last_newline = text.rfind('\n', start, end)
-                break_point = max(last_period, last_newline)
+                i = bisect_left(periods, end) - 1
+                break_point = periods[i] if i >= 0 else -1
 
                 if break_point > start + self.chunk_size // 2:
                     end = break_point + 1
@@ -188,7 +232,7 @@ class IngestionService:
 
             if chunk_text:
                 # Extract page number if present
-                page_match = re.search(r'\[Page (\d+)\]', chunk_text)
+                page_match = PAGE_MARKER_PATTERN.search(chunk_text)
                 page_number = int(page_match.group(1)) if page_match else None
 
                 chunks.append({
@@ -209,26 +253,51 @@ class IngestionService:
         return chunks
 
     async def _generate_embeddings(self, texts: list[str]) -> list[list[float]]:
-        """Generate embeddings using OpenAI API."""
+        """Generate embeddings using OpenAI API.
+
+        Texts already in the on-disk embedding cache are not sent again.
+        Batches are requested concurrently (bounded by the instance semaphore)
+        and results are returned in input order.
+        """
         if not texts:
             return []
 
-        # Process in batches of 100 (OpenAI limit)
-        batch_size = 100
-        all_embeddings = []
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        if embedding_cache is None:
+            embeddings: list[Optional[list[float]]] = [None] * len(texts)
+        else:
+            embeddings = await asyncio.to_thread(
+                embedding_cache.get_many, settings.embedding_model, texts
+            )
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+
+        missing_texts = [texts[i] for i in missing]
+        batches = await asyncio.gather(*(
+            self._embed_batch(missing_texts[i:i + EMBEDDING_BATCH_SIZE])
+            for i in range(0, len(missing_texts), EMBEDDING_BATCH_SIZE)
+        ))
+        new_embeddings = [embedding for batch in batches for embedding in batch]
+        for i, embedding in zip(missing, new_embeddings):
+            embeddings[i] = embedding
+
+        if embedding_cache is not None:
+            await asyncio.to_thread(
+                embedding_cache.set_many,
+                settings.embedding_model,
+                missing_texts,
+                new_embeddings,
+            )
+        return embeddings
 
+    async def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        """Embed one batch of texts in a single request."""
+        async with self._embedding_semaphore:
             response = await self.openai_client.embeddings.create(
                 model=settings.embedding_model,
                 input=batch,
             )
-
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
-
-        return all_embeddings
+        return [item.embedding for item in response.data]
 
     async def delete_document_chunks(self, document_id: int) -> None:
         """Delete all chunks for a document."""
@@ -242,14 +311,16 @@ class IngestionService:
         """Reprocess a document using stored raw_text or file_bytes."""
         async with get_db_context() as db:
             result = await db.execute(
-                select(Document).where(Document.id == document_id)
+                select(Document)
+                .where(Document.id == document_id)
+                .options(undefer(Document.raw_text))
             )
             document = result.scalar_one_or_none()
 
             if not document:
                 raise ValueError(f"Document {document_id} not found")
 
-            if not document.raw_text and not document.file_bytes:
+            if not document.raw_text and not document.has_file_bytes:
                 raise ValueError("No stored content available for reprocessing")
 
             document.status = "pending"
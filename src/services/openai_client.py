@@ -0,0 +1,46 @@
+"""Shared OpenAI client for all services in this worker."""
+
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from src.config import get_settings
+
+settings = get_settings()
+
+# One connection pool for chat, embedding and ingestion calls
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 50
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=3.0)
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, creating it on first use.
+
+    Reusing one client keeps TLS connections warm across requests instead of
+    building a new pool per service instance.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=OPENAI_TIMEOUT,
+            ),
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the shared client's connection pool (on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -4,13 +4,13 @@ import logging
 from dataclasses import dataclass
 from typing import Optional
 
-from openai import AsyncOpenAI
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import get_settings
-from src.database import get_db_context
+from src.database import EMBEDDING_COLUMN_TYPE, get_db_context
 from src.models.document import Document, DocumentChunk
+from src.services.openai_client import get_openai_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -35,7 +35,7 @@ class RetrievalService:
     def __init__(self):
         self.top_k = settings.top_k_retrieval
         self.rerank_top_k = settings.rerank_top_k
-        self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.openai_client = get_openai_client()
         self._reranker = None
 
     def _get_reranker(self):
@@ -58,20 +58,74 @@ class RetrievalService:
         top_k: Optional[int] = None,
         document_ids: Optional[list[int]] = None,
         rerank: bool = True,
+        query_embedding: Optional[list[float]] = None,
     ) -> list[RetrievalResult]:
-        """Search for relevant document chunks using pgvector."""
-        k = top_k or self.top_k
+        """Search for relevant document chunks using pgvector.
+
+        Pass query_embedding when the query was already embedded to skip the
+        embedding request.
+        """
+        if query_embedding is None:
+            query_embedding = await self.generate_embedding(query)
+
+        results = await self._search_embeddings(
+            [query], [query_embedding], top_k, document_ids, rerank
+        )
+        return results[0]
+
+    async def batch_search(
+        self,
+        queries: list[str],
+        top_k: Optional[int] = None,
+        document_ids: Optional[list[int]] = None,
+        rerank: bool = True,
+    ) -> list[list[RetrievalResult]]:
+        """Search several queries with one embedding request and one SQL query.
 
-        # Generate query embedding
-        query_embedding = await self._generate_embedding(query)
+        Returns one result list per query, in the same order.
+        """
+        if not queries:
+            return []
+
+        response = await self.openai_client.embeddings.create(
+            model=settings.embedding_model,
+            input=queries,
+        )
+        query_embeddings = [item.embedding for item in response.data]
+
+        return await self._search_embeddings(
+            queries, query_embeddings, top_k, document_ids, rerank
+        )
+
+    async def _search_embeddings(
+        self,
+        queries: list[str],
+        query_embeddings: list[list[float]],
+        top_k: Optional[int],
+        document_ids: Optional[list[int]],
+        rerank: bool,
+    ) -> list[list[RetrievalResult]]:
+        """Run the vector search for each embedding, then filter and rerank."""
+        k = top_k or self.top_k
 
         async with get_db_context() as db:
-            # Build pgvector similarity search query
-            # Using cosine distance: 1 - (embedding <=> query_embedding)
-            results = await self._vector_search(
-                db, query_embedding, k, document_ids
+            per_query = await self._vector_search(
+                db, query_embeddings, k, document_ids
             )
 
+        return [
+            self._filter_and_rerank(query, results, k, rerank)
+            for query, results in zip(queries, per_query)
+        ]
+
+    def _filter_and_rerank(
+        self,
+        query: str,
+        results: list[RetrievalResult],
+        k: int,
+        rerank: bool,
+    ) -> list[RetrievalResult]:
+        """Drop low-relevance results, rerank, and cut to the final size."""
         if not results:
             return []
 
@@ -93,54 +147,68 @@ class RetrievalService:
     async def _vector_search(
         self,
         db: AsyncSession,
-        query_embedding: list[float],
+        query_embeddings: list[list[float]],
         top_k: int,
         document_ids: Optional[list[int]] = None,
-    ) -> list[RetrievalResult]:
-        """Perform pgvector similarity search."""
+    ) -> list[list[RetrievalResult]]:
+        """Perform pgvector similarity search for each embedding in one query.
+
+        Each embedding gets its own ORDER BY ... LIMIT branch (so each can use
+        the HNSW index), combined with UNION ALL and tagged by position.
+        """
         # Build the query with cosine similarity
         # pgvector uses <=> for cosine distance, so similarity = 1 - distance
         # Note: We embed the vector directly in SQL since asyncpg has issues with ::vector cast
-        embedding_str = f"'[{','.join(str(x) for x in query_embedding)}]'::vector"
-
-        base_query = f"""
-            SELECT
-                dc.id as chunk_id,
-                dc.document_id,
-                d.original_filename as document_name,
-                dc.content,
-                dc.chunk_index,
-                dc.page_number,
-                1 - (dc.embedding <=> {embedding_str}) as similarity
-            FROM document_chunks dc
-            JOIN documents d ON dc.document_id = d.id
-            WHERE dc.embedding IS NOT NULL
-        """
-
+        document_filter = ""
         if document_ids:
             doc_ids_str = ",".join(str(d) for d in document_ids)
-            base_query += f" AND dc.document_id IN ({doc_ids_str})"
-
-        base_query += f"""
-            ORDER BY dc.embedding <=> {embedding_str}
-            LIMIT {top_k}
-        """
+            document_filter = f" AND dc.document_id IN ({doc_ids_str})"
 
-        result = await db.execute(text(base_query))
+        branches = []
+        for query_index, query_embedding in enumerate(query_embeddings):
+            embedding_str = (
+                f"'[{','.join(str(x) for x in query_embedding)}]'::{EMBEDDING_COLUMN_TYPE}"
+            )
+            branches.append(f"""(
+                SELECT
+                    {query_index} as query_index,
+                    dc.id as chunk_id,
+                    dc.document_id,
+                    d.original_filename as document_name,
+                    dc.content,
+                    dc.chunk_index,
+                    dc.page_number,
+                    1 - (dc.embedding <=> {embedding_str}) as similarity
+                FROM document_chunks dc
+                JOIN documents d ON dc.document_id = d.id
+                WHERE dc.embedding IS NOT NULL{document_filter}
+                ORDER BY dc.embedding <=> {embedding_str}
+                LIMIT {top_k}
+            )""")
+
+        # Applies to this transaction only, so pooled connections are unaffected
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.hnsw_ef_search)}"))
+        result = await db.execute(text("\nUNION ALL\n".join(branches)))
         rows = result.fetchall()
 
-        return [
-            RetrievalResult(
-                chunk_id=row.chunk_id,
-                document_id=row.document_id,
-                document_name=row.document_name,
-                content=row.content,
-                chunk_index=row.chunk_index,
-                page_number=row.page_number,
-                relevance_score=float(row.similarity) if row.similarity else 0.0,
+        per_query: list[list[RetrievalResult]] = [[] for _ in query_embeddings]
+        for row in rows:
+            per_query[row.query_index].append(
+                RetrievalResult(
+                    chunk_id=row.chunk_id,
+                    document_id=row.document_id,
+                    document_name=row.document_name,
+                    content=row.content,
+                    chunk_index=row.chunk_index,
+                    page_number=row.page_number,
+                    relevance_score=float(row.similarity) if row.similarity else 0.0,
+                )
             )
-            for row in rows
-        ]
+
+        # UNION ALL does not guarantee branch order is kept
+        for results in per_query:
+            results.sort(key=lambda r: r.relevance_score, reverse=True)
+        return per_query
 
     def _rerank_results(
         self,
@@ -174,7 +242,7 @@ class RetrievalService:
 
         return results
 
-    async def _generate_embedding(self, text: str) -> list[float]:
+    async def generate_embedding(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
         response = await self.openai_client.embeddings.create(
             model=settings.embedding_model,
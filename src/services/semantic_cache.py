@@ -0,0 +1,106 @@
+"""Semantic response cache keyed by query embedding similarity."""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+from src.cache import clear_on_write
+from src.config import get_settings
+from src.models.document import DocumentChunk
+
+settings = get_settings()
+
+
+@dataclass
+class _Entry:
+    """A cached value and the exact-match part of its key."""
+
+    key: Hashable
+    value: Any
+
+
+class SemanticResponseCache:
+    """Cache answers for queries whose embeddings are nearly identical.
+
+    Embeddings are kept as unit rows of one numpy matrix, so a lookup is a
+    single matrix-vector product; this is meant for up to a few thousand
+    entries. Besides the similarity threshold, a hit also requires an equal
+    key (e.g. request options that change the answer). Entries expire after
+    ttl seconds and the least recently used one is evicted when full.
+    Methods never await, so no lock is needed on a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries: list[Optional[_Entry]] = [None] * maxsize
+        self._vectors: Optional[np.ndarray] = None  # Allocated on first insert
+        self._expires_at = np.zeros(maxsize)
+        self._last_used = np.zeros(maxsize)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at > time.monotonic()))
+
+    def get(
+        self, embedding: list[float], key: Hashable = None
+    ) -> Optional[tuple[Any, float]]:
+        """Return (value, similarity) for the closest live entry above threshold."""
+        if self._vectors is None:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        scores = self._vectors @ _normalize(embedding)
+        scores[self._expires_at <= now] = -1.0
+        candidates = np.flatnonzero(scores >= self.threshold)
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            entry = self._entries[slot]
+            if entry is not None and entry.key == key:
+                self._last_used[slot] = now
+                self.hits += 1
+                return entry.value, float(scores[slot])
+
+        self.misses += 1
+        return None
+
+    def set(self, embedding: list[float], value: Any, key: Hashable = None) -> None:
+        """Store a value, reusing an expired slot or evicting the LRU entry."""
+        vector = _normalize(embedding)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+
+        now = time.monotonic()
+        # Expired and empty slots sort first, then least recently used
+        slot = int(
+            np.argmin(np.where(self._expires_at <= now, -np.inf, self._last_used))
+        )
+        self._vectors[slot] = vector
+        self._entries[slot] = _Entry(key=key, value=value)
+        self._expires_at[slot] = now + self.ttl
+        self._last_used[slot] = now
+
+    def clear(self) -> None:
+        """Drop all entries, e.g. after the corpus changed."""
+        self._entries = [None] * self.maxsize
+        self._expires_at[:] = 0
+
+
+def _normalize(embedding: list[float]) -> np.ndarray:
+    """Convert an embedding to a unit-length float32 vector."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# Shared by all agents in this worker; cleared whenever document chunks change
+semantic_cache = SemanticResponseCache(
+    maxsize=settings.semantic_cache_size,
+    ttl=settings.semantic_cache_ttl_seconds,
+    threshold=settings.semantic_cache_threshold,
+)
+clear_on_write(semantic_cache, DocumentChunk)
@@ -0,0 +1,131 @@
+"""Hourly rollups of trace events for the trace listing."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_db_context
+from src.models.trace import TraceEvent, TraceEventHourly
+
+logger = logging.getLogger(__name__)
+
+# Events are flushed when a request finishes, so an hour is only rolled up
+# once it has been closed for this long
+ROLLUP_GRACE = timedelta(minutes=5)
+
+# Closed hours before the watermark that each pass aggregates again, so events
+# flushed after their hour was rolled up are folded into its row
+ROLLUP_LOOKBACK = timedelta(hours=2)
+
+# TraceEventHourly columns filled from each (run, hour) group, after the key
+ROLLUP_AGGREGATES = (
+    "session_id",
+    "event_count",
+    "duration_sum_ms",
+    "tokens_sum",
+    "cost_sum_usd",
+    "error_count",
+    "first_event_at",
+    "last_event_at",
+)
+
+# Events before the watermark are covered by rollup rows; later ones are
+# aggregated from trace_events on read. None until the first rollup completes.
+_watermark: Optional[datetime] = None
+
+
+def get_rollup_watermark() -> Optional[datetime]:
+    """Return the time up to which trace events have been rolled up."""
+    return _watermark
+
+
+def _hour_bucket(dialect_name: str, column):
+    """SQL expression truncating a timestamp to the start of its hour."""
+    if dialect_name == "postgresql":
+        return func.date_trunc("hour", column)
+    # SQLite stores DateTime as text in this format
+    return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+
+
+async def _read_watermark(db: AsyncSession) -> Optional[datetime]:
+    """Derive the watermark from the latest rolled-up hour."""
+    result = await db.execute(select(func.max(TraceEventHourly.bucket_hour)))
+    last_bucket = result.scalar()
+    return last_bucket + timedelta(hours=1) if last_bucket else None
+
+
+async def rollup_trace_events(db: AsyncSession) -> Optional[datetime]:
+    """Roll up trace events from closed hours into TraceEventHourly.
+
+    Re-aggregates the ROLLUP_LOOKBACK hours before the watermark and overwrites
+    their rows, so late events are counted. Safe to run from several workers at
+    once. Returns the updated watermark.
+    """
+    global _watermark
+
+    until = (datetime.utcnow() - ROLLUP_GRACE).replace(
+        minute=0, second=0, microsecond=0
+    )
+    watermark = await _read_watermark(db)
+    since = watermark - ROLLUP_LOOKBACK if watermark else None
+
+    if since is None or since < until:
+        dialect_name = db.bind.dialect.name
+        bucket = _hour_bucket(dialect_name, TraceEvent.timestamp)
+        source = (
+            select(
+                TraceEvent.run_id,
+                bucket,
+                TraceEvent.session_id,
+                func.count(TraceEvent.id),
+                func.coalesce(func.sum(TraceEvent.duration_ms), 0),
+                func.coalesce(
+                    func.sum(
+                        func.coalesce(TraceEvent.tokens_in, 0)
+                        + func.coalesce(TraceEvent.tokens_out, 0)
+                    ),
+                    0,
+                ),
+                func.coalesce(func.sum(TraceEvent.cost_usd), 0.0),
+                func.sum(case((TraceEvent.status == "error", 1), else_=0)),
+                func.min(TraceEvent.timestamp),
+                func.max(TraceEvent.timestamp),
+            )
+            .where(TraceEvent.timestamp < until)
+            .group_by(TraceEvent.run_id, bucket, TraceEvent.session_id)
+        )
+        if since is not None:
+            source = source.where(TraceEvent.timestamp >= since)
+
+        insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        stmt = insert(TraceEventHourly).from_select(
+            ["run_id", "bucket_hour", *ROLLUP_AGGREGATES], source
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["run_id", "bucket_hour"],
+                set_={column: stmt.excluded[column] for column in ROLLUP_AGGREGATES},
+            )
+        )
+        await db.commit()
+        watermark = await _read_watermark(db)
+
+    _watermark = watermark
+    return _watermark
+
+
+async def run_trace_rollups(interval_seconds: int) -> None:
+    """Roll up trace events every interval_seconds until cancelled."""
+    while True:
+        try:
+            async with get_db_context() as db:
+                await rollup_trace_events(db)
+        except Exception as e:
+            logger.error(f"Trace rollup failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -1,17 +1,27 @@
 """Tracing service for observability."""
 
-import json
 import logging
+import os
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.trace import TraceEvent
+from src.services.tracing_buffer import trace_buffer
 
 logger = logging.getLogger(__name__)
 
+# Columns written on flush; id and created_at are filled in by the database
+TRACE_EVENT_INSERT_COLUMNS = tuple(
+    column.key
+    for column in TraceEvent.__table__.columns
+    if column.key not in ("id", "created_at")
+)
+
 
 # Approximate costs per 1K tokens (as of 2024)
 MODEL_COSTS = {
@@ -25,6 +35,19 @@ MODEL_COSTS = {
 }
 
 
+def generate_id() -> str:
+    """Generate a time-ordered UUIDv7 string for run, session and trace IDs.
+
+    Successive IDs sort by creation time, so inserts into the indexed ID
+    columns land at the end of the index instead of at random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms << 80) | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
 def _estimate_cost(model: str, tokens_in: int, tokens_out: int) -> float:
     """Estimate cost based on model and token counts."""
     costs = MODEL_COSTS.get(model, {"input": 0.01, "output": 0.03})
@@ -37,7 +60,7 @@ class TracingService:
     def __init__(self, run_id: str, session_id: str):
         self.run_id = run_id
         self.session_id = session_id
-        self.trace_id = str(uuid.uuid4())
+        self.trace_id = generate_id()
         self.events: list[TraceEvent] = []
 
     async def log_retrieval(
@@ -55,11 +78,11 @@ class TracingService:
             session_id=self.session_id,
             event_type="retrieval",
             event_name="vector_search",
-            event_data=json.dumps({
+            event_data={
                 "query": query,
                 "results_count": len(results),
                 "results": results,
-            }),
+            },
             duration_ms=duration_ms,
             status=status,
             error_message=error_message,
@@ -87,11 +110,11 @@ class TracingService:
             session_id=self.session_id,
             event_type="model_call",
             event_name=model,
-            event_data=json.dumps({
+            event_data={
                 "model": model,
                 "messages_count": len(messages),
                 "response_preview": response[:500] if response else "",
-            }),
+            },
             duration_ms=duration_ms,
             tokens_in=tokens_in,
             tokens_out=tokens_out,
@@ -118,11 +141,11 @@ class TracingService:
             session_id=self.session_id,
             event_type="tool_call",
             event_name=tool_name,
-            event_data=json.dumps({
+            event_data={
                 "tool_name": tool_name,
                 "args": tool_args,
                 "output_preview": str(tool_output)[:500] if tool_output else "",
-            }),
+            },
             duration_ms=duration_ms,
             status=status,
             error_message=error_message,
@@ -145,11 +168,11 @@ class TracingService:
             session_id=self.session_id,
             event_type="validation",
             event_name=validation_type,
-            event_data=json.dumps({
+            event_data={
                 "validation_type": validation_type,
                 "is_valid": is_valid,
                 "errors": errors or [],
-            }),
+            },
             duration_ms=duration_ms,
             status="success" if is_valid else "retry",
             timestamp=datetime.utcnow(),
@@ -169,10 +192,10 @@ class TracingService:
             session_id=self.session_id,
             event_type="error",
             event_name=error_type,
-            event_data=json.dumps({
+            event_data={
                 "error_type": error_type,
                 "context": context or {},
-            }),
+            },
             status="error",
             error_message=error_message,
             timestamp=datetime.utcnow(),
@@ -180,12 +203,26 @@ class TracingService:
         self.events.append(event)
 
     async def flush(self, db: AsyncSession) -> None:
-        """Flush all events to the database."""
+        """Flush all events to the database.
+
+        When the shared trace buffer is running the events are handed to it and
+        written with other requests' events in the next batch.
+        """
         if not self.events:
             return
 
+        rows = [
+            {key: getattr(event, key) for key in TRACE_EVENT_INSERT_COLUMNS}
+            for event in self.events
+        ]
+        if trace_buffer.running:
+            trace_buffer.put_many(rows)
+            self.events = []
+            return
+
         try:
-            db.add_all(self.events)
+            # One executemany INSERT without RETURNING, bypassing the unit of work
+            await db.execute(insert(TraceEvent), rows)
             await db.commit()
             self.events = []
         except Exception as e:
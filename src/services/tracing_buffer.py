@@ -0,0 +1,98 @@
+"""In-process buffer that batches trace event inserts across requests."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import insert
+
+from src.config import get_settings
+from src.database import get_db_context
+from src.models.trace import TraceEvent
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TraceEventBuffer:
+    """Queue of trace event rows written by one background task.
+
+    Rows are inserted in a single executemany once batch_size rows are
+    queued or flush_interval_s has passed since the first row of the batch.
+    """
+
+    def __init__(self, batch_size: int = 1000, flush_interval_s: float = 0.05):
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: asyncio.Queue[Optional[dict]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the flusher task is accepting rows."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        """Number of rows waiting to be written."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        if not self.running:
+            self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        """Write every queued row, then stop the flusher."""
+        if not self.running:
+            return
+        # Rows queued before the sentinel are still written (FIFO)
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    def put_many(self, rows: list[dict]) -> None:
+        """Queue trace event rows for the next batch."""
+        for row in rows:
+            self._queue.put_nowait(row)
+
+    async def _flusher(self) -> None:
+        """Collect rows into batches and write them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval_s
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._write(batch)
+
+    async def _write(self, batch: list[dict]) -> None:
+        """Insert one batch; failures are logged so the flusher keeps running."""
+        try:
+            async with get_db_context() as db:
+                await db.execute(insert(TraceEvent), batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} trace events: {e}")
+
+
+# Shared by all requests in this worker; started in the app lifespan
+trace_buffer = TraceEventBuffer(
+    batch_size=settings.trace_batch_size,
+    flush_interval_s=settings.trace_flush_interval_ms / 1000,
+)
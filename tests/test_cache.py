@@ -0,0 +1,22 @@
+"""Tests for the in-process TTL cache."""
+
+from src.cache import TTLCache
+
+
+def test_evicts_least_recently_used():
+    """The oldest untouched entry is dropped once maxsize is exceeded."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire():
+    """Entries past their TTL are treated as missing."""
+    cache = TTLCache(maxsize=2, ttl=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
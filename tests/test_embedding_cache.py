@@ -0,0 +1,24 @@
+"""Tests for the on-disk embedding cache."""
+
+from src.services.embedding_cache import EmbeddingCache
+
+
+def test_round_trip_and_misses(tmp_path):
+    """Stored embeddings come back in order; unknown texts are None."""
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    cache.set_many("model-a", ["x", "y"], [[0.5, 1.0], [2.0, -1.0]])
+    assert cache.get_many("model-a", ["y", "z", "x"]) == [[2.0, -1.0], None, [0.5, 1.0]]
+    cache.close()
+
+
+def test_keys_include_model(tmp_path):
+    """The same text embedded by another model is a miss, also after reopening."""
+    path = str(tmp_path / "embeddings.sqlite3")
+    cache = EmbeddingCache(path)
+    cache.set_many("model-a", ["x"], [[1.0]])
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.get_many("model-b", ["x"]) == [None]
+    assert reopened.get_many("model-a", ["x"]) == [[1.0]]
+    reopened.close()
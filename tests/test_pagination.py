@@ -0,0 +1,22 @@
+"""Tests for keyset pagination helpers."""
+
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Encoded cursors decode back to the same position."""
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_invalid_cursor_rejected():
+    """Malformed cursors raise a 400 instead of a server error."""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,59 @@
+"""Tests for the semantic response cache."""
+
+from src.services.semantic_cache import SemanticResponseCache
+
+A = [1.0, 0.0, 0.0]
+B = [0.0, 1.0, 0.0]
+C = [0.0, 0.0, 1.0]
+
+
+def test_hit_above_threshold():
+    """A nearly identical embedding returns the value and its similarity."""
+    cache = SemanticResponseCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.set(A, "answer", key=5)
+    value, similarity = cache.get([0.99, 0.1, 0.0], key=5)
+    assert value == "answer"
+    assert similarity > 0.9
+    assert cache.get(B, key=5) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_miss_when_key_differs():
+    """Similar embeddings only match entries stored under an equal key."""
+    cache = SemanticResponseCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.set(A, "answer", key=5)
+    assert cache.get(A, key=3) is None
+
+
+def test_expired_slot_is_reused():
+    """An expired entry's slot is taken before evicting a live entry."""
+    cache = SemanticResponseCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.set(B, "live")
+    cache.ttl = -1
+    cache.set(A, "expired")
+    cache.ttl = 60
+    assert cache.get(A) is None
+    cache.set(C, "new")
+    assert cache.get(B)[0] == "live"
+    assert cache.get(C)[0] == "new"
+
+
+def test_evicts_least_recently_used():
+    """The oldest untouched entry is dropped once the cache is full."""
+    cache = SemanticResponseCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.set(A, "a")
+    cache.set(B, "b")
+    cache.get(A)
+    cache.set(C, "c")
+    assert cache.get(A)[0] == "a"
+    assert cache.get(B) is None
+    assert cache.get(C)[0] == "c"
+
+
+def test_clear():
+    """clear() drops every entry."""
+    cache = SemanticResponseCache(maxsize=2, ttl=60, threshold=0.9)
+    cache.set(A, "a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get(A) is None